@@ -0,0 +1,214 @@
+import itertools
+import json
+import random
+from datetime import date, timedelta
+
+from lib.controllers.AuthController import create_access_token
+from benchmarks.seed import BENCHMARK_PASSWORD, FAVOURITE_RECIPE_STEP, user_email, user_uuid
+
+
+class BenchmarkContext:
+    def __init__(self, users: int, fresh_users: int, meals_per_user: int, recipes: int,
+                 water_intake_ids: list[tuple[int, str]]):
+        self.users = users
+        self.meals_per_user = meals_per_user
+        self.recipes = recipes
+        self.random = random.Random(42)
+        self.tokens = {}
+        self._fresh_users = iter(range(users + 1, users + fresh_users + 1))
+        self._deleted_meals = itertools.count()
+        self._removed_favourites = itertools.count()
+        self._registrations = itertools.count()
+        self._future_days = itertools.count(1)
+        self._water_intake_ids = iter(water_intake_ids)
+        self.revoke_user = users + fresh_users
+        self.revoke_token = self.token_for(self.revoke_user)
+
+    def token_for(self, index: int):
+        if index not in self.tokens:
+            self.tokens[index] = create_access_token(
+                data={"sub": user_email(index), "uuid": user_uuid(index), "ver": 0}
+            )
+        return self.tokens[index]
+
+    def auth(self, index: int | None = None):
+        index = index or self.random.randint(1, self.users)
+        return {"Authorization": f"Bearer {self.token_for(index)}"}
+
+    def next_fresh_user(self):
+        return next(self._fresh_users)
+
+    def next_meal_to_delete(self):
+        # Walks meals from the oldest end so each is deleted exactly once
+        count = next(self._deleted_meals)
+        return f"bench-meal-{count % self.users + 1}-{self.meals_per_user - count // self.users}"
+
+    def next_favourite_to_remove(self):
+        # Seeded favourites, each removed exactly once
+        count = next(self._removed_favourites)
+        return count % self.users + 1, f"bench-recipe-{1 + count // self.users * FAVOURITE_RECIPE_STEP}"
+
+    def next_water_intake(self):
+        return next(self._water_intake_ids)
+
+    def next_future_day(self):
+        # Past days are already seeded, single-row inserts keyed by date go after them
+        return (date.today() + timedelta(days=next(self._future_days))).isoformat()
+
+    def random_day(self):
+        return (date.today() - timedelta(days=self.random.randint(0, 400))).isoformat()
+
+
+class EndpointSpec:
+    def __init__(self, build, sequential: bool = False, after=None):
+        self.build = build
+        # Stateful endpoints are driven one request at a time
+        self.sequential = sequential
+        self.after = after
+
+
+def options_body(context: BenchmarkContext):
+    return {
+        "gender": context.random.choice(["Чоловік", "Жінка"]),
+        "height": context.random.randint(150, 200),
+        "weight": context.random.randint(50, 120),
+        "weightGoal": "Підтримувати нинішню вагу",
+        "activityLevel": "active",
+        "age": context.random.randint(18, 80),
+    }
+
+
+def meal_body(context: BenchmarkContext):
+    return {
+        "title": "Benchmark meal",
+        "weight": 250,
+        "mealType": context.random.choice(["Breakfast", "Lunch", "Dinner", "Snack"]),
+        "calories": context.random.randint(100, 900),
+        "proteins": context.random.randint(5, 60),
+        "fats": context.random.randint(5, 50),
+        "carbs": context.random.randint(10, 120),
+    }
+
+
+def build_register(context):
+    count = next(context._registrations)
+    return {"method": "POST", "url": "/api/register",
+            "json": {"email": f"bench-register-{count}-{context.random.random()}@example.com", "password": "pw"}}
+
+
+def build_save_options(context):
+    return {"method": "POST", "url": "/api/save-user-options", "json": options_body(context),
+            "headers": context.auth(context.next_fresh_user())}
+
+
+def build_delete_water_intake(context):
+    water_intake_id, owner_uuid = context.next_water_intake()
+    return {"method": "DELETE", "url": f"/api/delete_water_intake/{water_intake_id}",
+            "headers": context.auth(int(owner_uuid.rsplit("-", 1)[1]))}
+
+
+def build_remove_favourite_recipe(context):
+    user_index, recipe_uuid = context.next_favourite_to_remove()
+    return {"method": "DELETE", "url": f"/api/favourite_recipes/{recipe_uuid}", "headers": context.auth(user_index)}
+
+
+def build_import_weights(context):
+    start = date.today() - timedelta(days=context.random.randint(0, 3000))
+    lines = [json.dumps({"date": (start + timedelta(days=day)).isoformat(), "weight": 70 + day % 5 * 0.1})
+             for day in range(100)]
+    return {"method": "POST", "url": "/api/import_weights", "content": "\n".join(lines),
+            "headers": {**context.auth(), "content-type": "application/x-ndjson"}}
+
+
+def build_import_water_intakes(context):
+    rows = [f"{context.random_day()},250" for _ in range(100)]
+    return {"method": "POST", "url": "/api/import_water_intakes", "content": "date,ml\n" + "\n".join(rows),
+            "headers": {**context.auth(), "content-type": "text/csv"}}
+
+
+def build_revoke_tokens(context):
+    return {"method": "POST", "url": "/api/revoke-tokens",
+            "headers": {"Authorization": f"Bearer {context.revoke_token}"}}
+
+
+def after_revoke_tokens(context, response):
+    if response.status_code == 200:
+        context.revoke_token = response.json()["accessToken"]
+
+
+ENDPOINT_SPECS = {
+    ("GET", "/"): EndpointSpec(lambda context: {"method": "GET", "url": "/"}),
+    ("GET", "/health/db-pool"): EndpointSpec(lambda context: {"method": "GET", "url": "/health/db-pool"}),
+    ("GET", "/metrics"): EndpointSpec(lambda context: {"method": "GET", "url": "/metrics"}),
+    ("POST", "/api/register"): EndpointSpec(build_register),
+    ("POST", "/api/login"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/login",
+        "json": {"email": user_email(context.random.randint(1, context.users)), "password": BENCHMARK_PASSWORD}}),
+    ("POST", "/api/revoke-tokens"): EndpointSpec(build_revoke_tokens, sequential=True, after=after_revoke_tokens),
+    ("POST", "/api/save-user-options"): EndpointSpec(build_save_options),
+    ("POST", "/api/update-user-options"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/update-user-options", "json": options_body(context),
+        "headers": context.auth()}),
+    ("GET", "/api/get-user-options"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/get-user-options", "headers": context.auth()}),
+    ("POST", "/api/update-user_macros"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/update-user_macros",
+        "json": {"calories": 2000, "proteins": 125, "carbs": 225, "fats": 66}, "headers": context.auth()}),
+    ("GET", "/api/get-user-macros"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/get-user-macros", "headers": context.auth()}),
+    ("GET", "/api/recommended-user-macros"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/recommended-user-macros", "headers": context.auth()}),
+    ("POST", "/api/create_meal"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/create_meal", "json": meal_body(context), "headers": context.auth()}),
+    ("POST", "/api/create_meals_bulk"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/create_meals_bulk",
+        "json": [meal_body(context) for _ in range(20)], "headers": context.auth()}),
+    ("GET", "/api/meals"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/meals", "params": {"limit": 100}, "headers": context.auth()}),
+    ("DELETE", "/api/meals/{uuid}"): EndpointSpec(lambda context: {
+        "method": "DELETE", "url": f"/api/meals/{context.next_meal_to_delete()}"}),
+    ("POST", "/api/add_water_intake"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/add_water_intake", "json": {"ml": 250}, "headers": context.auth()}),
+    ("DELETE", "/api/delete_water_intake/{water_intake_id}"): EndpointSpec(build_delete_water_intake),
+    ("GET", "/api/water_intakes"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/water_intakes", "params": {"day": context.random_day()},
+        "headers": context.auth()}),
+    ("GET", "/api/recommended_water_intake"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/recommended_water_intake", "headers": context.auth()}),
+    ("POST", "/api/import_water_intakes"): EndpointSpec(build_import_water_intakes),
+    ("POST", "/api/add_weight"): EndpointSpec(lambda context: {
+        "method": "POST", "url": "/api/add_weight",
+        "json": {"weight": 75.5, "date": context.next_future_day()}, "headers": context.auth()}),
+    ("POST", "/api/import_weights"): EndpointSpec(build_import_weights),
+    ("GET", "/api/weights"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/weights", "headers": context.auth()}),
+    ("GET", "/api/weights/trend"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/weights/trend", "params": {"goal_weight": 65}, "headers": context.auth()}),
+    # Authenticated, so the per-user isFavourite encoding is what gets measured
+    ("GET", "/api/recipes"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/recipes", "headers": context.auth()}),
+    ("GET", "/api/recipes/suggest"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/recipes/suggest", "params": {"mealType": "Breakfast"},
+        "headers": context.auth()}),
+    ("GET", "/api/recipes/{uuid}"): EndpointSpec(lambda context: {
+        "method": "GET", "url": f"/api/recipes/bench-recipe-{context.random.randint(1, context.recipes)}"}),
+    ("GET", "/api/favourite_recipes"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/favourite_recipes", "headers": context.auth()}),
+    ("POST", "/api/favourite_recipes/{recipe_uuid}"): EndpointSpec(lambda context: {
+        "method": "POST", "url": f"/api/favourite_recipes/bench-recipe-{context.random.randint(1, context.recipes)}",
+        "headers": context.auth()}),
+    ("DELETE", "/api/favourite_recipes/{recipe_uuid}"): EndpointSpec(build_remove_favourite_recipe),
+    ("GET", "/api/nutrition-summary/daily"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/nutrition-summary/daily", "params": {"day": context.random_day()},
+        "headers": context.auth()}),
+    ("GET", "/api/nutrition-summary"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/nutrition-summary", "headers": context.auth()}),
+    ("GET", "/api/nutrition-summary/history"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/nutrition-summary/history", "headers": context.auth()}),
+    ("GET", "/api/export/{table}"): EndpointSpec(lambda context: {
+        "method": "GET", "url": f"/api/export/{context.random.choice(['meals', 'water_intakes', 'weights'])}",
+        "params": {"format": context.random.choice(["csv", "ndjson"])},
+        "headers": {**context.auth(), "Accept-Encoding": "gzip"}}),
+    ("GET", "/api/dashboard"): EndpointSpec(lambda context: {
+        "method": "GET", "url": "/api/dashboard", "params": {"day": context.random_day()}, "headers": context.auth()}),
+}
@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+import httpx
+import numpy as np
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+
+from benchmarks.endpoints import BenchmarkContext, ENDPOINT_SPECS
+from lib.database.config import engine
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def registered_routes(app):
+    return sorted(
+        (method, route.path)
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    )
+
+
+def load_water_intake_ids(users: int, limit: int):
+    with engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(text(
+            'SELECT "uuid", "userUuid" FROM "WaterIntake" WHERE "userUuid" LIKE \'bench-user-%\' '
+            'ORDER BY "uuid" LIMIT :limit'
+        ), {"limit": limit})]
+
+
+async def measure_endpoint(client, spec, context, requests: int, concurrency: int, warmup: int):
+    latencies = []
+    errors = 0
+
+    async def send():
+        started = time.perf_counter()
+        response = await client.request(**spec.build(context))
+        elapsed = time.perf_counter() - started
+        if spec.after:
+            spec.after(context, response)
+        return elapsed, response.status_code
+
+    for _ in range(warmup):
+        await send()
+
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in pending:
+            elapsed, status_code = await send()
+            latencies.append(elapsed)
+            if status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(1 if spec.sequential else concurrency)])
+    wall_time = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99]).tolist()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50Ms": round(p50, 3),
+        "p95Ms": round(p95, 3),
+        "p99Ms": round(p99, 3),
+        "rps": round(len(latencies) / wall_time, 1),
+    }
+
+
+async def run_benchmarks(args):
+    import main
+
+    # The client logs every request at INFO, which would load the app's log queue
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    routes = [
+        route for route in registered_routes(main.app)
+        if not route[1].startswith(("/docs", "/redoc", "/openapi")) and re.search(args.only, f"{route[0]} {route[1]}")
+    ]
+    missing = [route for route in routes if route not in ENDPOINT_SPECS]
+    for method, path in missing:
+        print(f"warning: no benchmark spec for {method} {path}", file=sys.stderr)
+
+    context = BenchmarkContext(args.users, args.fresh_users, args.meals_per_user, args.recipes,
+                               load_water_intake_ids(args.users, (args.requests + args.warmup) * 2))
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark",
+                                   timeout=60)
+
+    results = {}
+    async with client:
+        if args.base_url:
+            results = await measure_routes(client, routes, context, args)
+        else:
+            async with main.app.router.lifespan_context(main.app):
+                results = await measure_routes(client, routes, context, args)
+
+    return results
+
+
+async def measure_routes(client, routes, context, args):
+    results = {}
+    for method, path in routes:
+        spec = ENDPOINT_SPECS.get((method, path))
+        if spec is None:
+            continue
+        results[f"{method} {path}"] = await measure_endpoint(
+            client, spec, context, args.requests, args.concurrency, args.warmup
+        )
+        print(format_result(f"{method} {path}", results[f"{method} {path}"]))
+    return results
+
+
+def format_result(name: str, result: dict):
+    return (f"{name:55} p50 {result['p50Ms']:9.2f}ms  p95 {result['p95Ms']:9.2f}ms  "
+            f"p99 {result['p99Ms']:9.2f}ms  {result['rps']:9.1f} req/s  errors {result['errors']}")
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if result["p95Ms"] > previous["p95Ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95Ms']}ms -> {result['p95Ms']}ms")
+        if result["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['rps']} -> {result['rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drive every API route against a seeded benchmark database (see benchmarks.seed) "
+                    "and report latency percentiles and throughput."
+    )
+    parser.add_argument("--base-url", help="Benchmark a running server over HTTP instead of in-process")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", default="", help="Regex matched against 'METHOD /path'")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--fresh-users", type=int, default=2000)
+    parser.add_argument("--meals-per-user", type=int, default=2000)
+    parser.add_argument("--recipes", type=int, default=500)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression, 0.2 = 20%%")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args))
+    report = {
+        "mode": "http" if args.base_url else "in-process",
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against, run with --save-baseline first")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if (baseline.get("mode"), baseline.get("concurrency")) != (report["mode"], report["concurrency"]):
+        print("warning: baseline was recorded with a different mode or concurrency", file=sys.stderr)
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
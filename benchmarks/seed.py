@@ -0,0 +1,105 @@
+import argparse
+
+from sqlalchemy import text
+
+from lib.database.config import engine, SessionLocal, Base
+from lib.utils.DailyRollupUtils import rebuild_daily_rollups
+from lib.utils.PasswordUtils import password_context
+
+BENCHMARK_PASSWORD = "benchmark-password"
+# Every user favourites recipes 1, 1 + step, 1 + 2 * step, ...
+FAVOURITE_RECIPE_STEP = 10
+
+
+def user_uuid(index: int):
+    return f"bench-user-{index}"
+
+
+def user_email(index: int):
+    return f"bench{index}@example.com"
+
+
+def seed_database(users: int, fresh_users: int, meals_per_user: int, weight_days: int, water_per_user: int,
+                  recipes: int):
+    # Everything is generated server-side with generate_series so seeding millions of rows stays fast
+    password_hash = password_context.hash(BENCHMARK_PASSWORD)
+    total_users = users + fresh_users
+    with engine.begin() as connection:
+        connection.execute(text("""
+            TRUNCATE "UserDailyRollup", "FavouriteRecipes", "UserMeals", "Meal", "WaterIntake", "UserWeight",
+                     "UserMacros", "UserOptions", "Recipe", "User" CASCADE
+        """))
+        connection.execute(text("""
+            INSERT INTO "User" ("uuid", "email", "password", "registeredAt", "tokenVersion")
+            SELECT 'bench-user-' || g, 'bench' || g || '@example.com', :password, date '2020-01-01', 0
+            FROM generate_series(1, :total_users) g
+        """), {"password": password_hash, "total_users": total_users})
+        # Users above `users` are left without options so save-user-options has someone to save for
+        connection.execute(text("""
+            INSERT INTO "UserOptions" ("userUuid", "gender", "height", "weight", "weightGoal", "activityLevel",
+                                       "age", "caloriesIntake")
+            SELECT 'bench-user-' || g, CASE WHEN g % 2 = 0 THEN 'Чоловік' ELSE 'Жінка' END,
+                   150 + g % 50, 50 + g % 70, 'Підтримувати нинішню вагу', 'active', 18 + g % 60, 2000
+            FROM generate_series(1, :users) g
+        """), {"users": users})
+        connection.execute(text("""
+            INSERT INTO "UserMacros" ("userUuid", "calories", "proteins", "carbs", "fats")
+            SELECT 'bench-user-' || g, 2000, 125, 225, 66 FROM generate_series(1, :users) g
+        """), {"users": users})
+        connection.execute(text("""
+            INSERT INTO "Meal" ("uuid", "title", "fats", "proteins", "calories", "carbs", "mealType", "weight",
+                                "date", "userUuid")
+            SELECT 'bench-meal-' || u || '-' || m, 'Meal ' || m, 10 + m % 20, 20 + m % 30, 300 + m % 400,
+                   40 + m % 50, (ARRAY['Breakfast', 'Lunch', 'Dinner', 'Snack'])[1 + m % 4]::mealtype, 250,
+                   current_date - (m / 4), 'bench-user-' || u
+            FROM generate_series(1, :users) u, generate_series(1, :meals_per_user) m
+        """), {"users": users, "meals_per_user": meals_per_user})
+        connection.execute(text("""
+            INSERT INTO "UserWeight" ("userUuid", "weight", "date")
+            SELECT 'bench-user-' || u, 60 + u % 40 + sin(d / 10.0) * 2 - d * 0.01, current_date - d
+            FROM generate_series(1, :users) u, generate_series(0, :weight_days - 1) d
+        """), {"users": users, "weight_days": weight_days})
+        connection.execute(text("""
+            INSERT INTO "WaterIntake" ("currentIntake", "date", "userUuid")
+            SELECT 250, current_date - (w / 6), 'bench-user-' || u
+            FROM generate_series(1, :users) u, generate_series(1, :water_per_user) w
+        """), {"users": users, "water_per_user": water_per_user})
+        connection.execute(text("""
+            INSERT INTO "Recipe" ("uuid", "proteins", "fats", "calories", "carbs", "isPopular", "coverImage",
+                                  "description", "title", "cookingTime", "mealType")
+            SELECT 'bench-recipe-' || r, 10 + r % 40, 5 + r % 30, 200 + r % 600, 20 + r % 80, r % 10 = 0,
+                   'https://example.com/' || r || '.jpg', repeat('Step by step instructions. ', 80),
+                   'Recipe ' || r, (10 + r % 50) || ' min', (ARRAY['breakfast', 'lunch', 'dinner', 'snack'])[1 + r % 4]
+            FROM generate_series(1, :recipes) r
+        """), {"recipes": recipes})
+        connection.execute(text("""
+            INSERT INTO "FavouriteRecipes" ("uuid", "userUuid", "recipeUuid")
+            SELECT 'bench-favourite-' || u || '-' || r, 'bench-user-' || u, 'bench-recipe-' || r
+            FROM generate_series(1, :users) u, generate_series(1, :recipes, :step) r
+        """), {"users": users, "recipes": recipes, "step": FAVOURITE_RECIPE_STEP})
+
+    with SessionLocal() as db:
+        rebuild_daily_rollups(db)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed a local benchmark database. Point DB_* at a throwaway Postgres, this truncates every table."
+    )
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables from the models first")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--fresh-users", type=int, default=2000)
+    parser.add_argument("--meals-per-user", type=int, default=2000)
+    parser.add_argument("--weight-days", type=int, default=3 * 365)
+    parser.add_argument("--water-per-user", type=int, default=1500)
+    parser.add_argument("--recipes", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+    seed_database(args.users, args.fresh_users, args.meals_per_user, args.weight_days, args.water_per_user,
+                  args.recipes)
+    print("Seeded benchmark database")
@@ -0,0 +1,65 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.RecipesController import (
+    RecipeCatalogueItem, RecipeResponse, RecipeSuggestionsResponse, optional_oauth2_scheme
+)
+from lib.database.config import get_async_db
+from lib.database.models import Recipe
+from lib.utils.FavouriteRecipesUtils import favourite_uuids_query, recipe_list_response
+from lib.utils.RecipeCatalogueUtils import get_recipe_catalogue_async
+from lib.utils.RecipeSuggestionUtils import (
+    DEFAULT_SUGGESTION_LIMIT, MAX_SUGGESTION_LIMIT, remaining_macros_query, build_suggestions
+)
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncRecipesRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncRecipesRouter.get("/recipes", status_code=200, response_model=list[RecipeCatalogueItem])
+async def get_recipes(if_none_match: Optional[str] = Header(None),
+                      db: AsyncSession = Depends(get_async_db),
+                      token: Optional[str] = Depends(optional_oauth2_scheme)):
+    catalogue = await get_recipe_catalogue_async(db)
+
+    favourites = set()
+    if token:
+        user = await get_user_from_token_async(token, db)
+        favourites = set((await db.execute(favourite_uuids_query(user.uuid))).scalars())
+
+    return recipe_list_response(catalogue, favourites, if_none_match)
+
+
+@asyncRecipesRouter.get("/recipes/suggest", status_code=200, response_model=RecipeSuggestionsResponse)
+async def suggest_recipes(meal_type: Optional[str] = Query(None, alias="mealType"),
+                          limit: int = Query(DEFAULT_SUGGESTION_LIMIT, ge=1, le=MAX_SUGGESTION_LIMIT),
+                          db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        row = (await db.execute(remaining_macros_query(user.uuid, date.today()))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="UserMacros not found for this user.")
+
+        favourites = set((await db.execute(favourite_uuids_query(user.uuid))).scalars())
+        return build_suggestions(await get_recipe_catalogue_async(db), row, meal_type, limit, favourites)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncRecipesRouter.get("/recipes/{uuid}", status_code=200, response_model=RecipeResponse)
+async def get_recipe(uuid: str, db: AsyncSession = Depends(get_async_db)):
+    recipe = await db.get(Recipe, uuid)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    return recipe
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.UserMacrosController import UserMacrosSchema, UserMacrosResponse
+from lib.database.config import get_async_db
+from lib.database.models import UserMacros, UserOptions
+from lib.utils.RecommendationCacheUtils import get_cached_recommendations, cache_recommendations
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncUserMacrosRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncUserMacrosRouter.get("/get-user-macros", status_code=200, response_model=UserMacrosResponse)
+async def get_user_macros(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        user_macros = await db.get(UserMacros, user.uuid)
+        if not user_macros:
+            raise HTTPException(status_code=404, detail="UserMacros not found for this user.")
+
+        return {
+            "calories": user_macros.calories,
+            "proteins": user_macros.proteins,
+            "carbs": user_macros.carbs,
+            "fats": user_macros.fats
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserMacrosRouter.get("/recommended-user-macros", status_code=200,
+                           response_model=DataResponse[UserMacrosSchema])
+async def recommended_user_macros(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        user_macros = get_cached_recommendations(user.uuid)
+        if user_macros is None:
+            user_options = await db.get(UserOptions, user.uuid)
+            if not user_options:
+                raise HTTPException(status_code=404, detail="UserOptions not found for this user.")
+
+            user_macros = cache_recommendations(user.uuid, user_options)
+
+        if user_macros["calories"] is None:
+            raise HTTPException(status_code=400, detail="UserOptions are incomplete for this user.")
+
+        return {
+            "message": "Recommended UserMacros calculated successfully",
+            "data": {
+                "calories": user_macros["calories"],
+                "proteins": user_macros["proteins"],
+                "carbs": user_macros["carbs"],
+                "fats": user_macros["fats"]
+            }
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
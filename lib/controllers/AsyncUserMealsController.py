@@ -0,0 +1,95 @@
+import uuid
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.UserMealsController import (
+    MealCreate, MealResponse, MEAL_COLUMNS, get_meals_page_filters, set_next_cursor
+)
+from lib.database.config import get_async_db
+from lib.database.models import Meal
+from lib.utils.DailyRollupUtils import meal_rollup_statement, delete_meal_statement
+from lib.utils.PaginationUtils import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from lib.utils.ResponseUtils import MessageResponse, DataResponse
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncUserMealsRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncUserMealsRouter.post("/create_meal", status_code=201, response_model=DataResponse[MealCreate])
+async def create_meal(meal: MealCreate, db: AsyncSession = Depends(get_async_db),
+                      token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        new_meal = Meal(
+            userUuid=user.uuid,
+            uuid=str(uuid.uuid4()),
+            title=meal.title,
+            weight=int(meal.weight),
+            mealType=meal.mealType,
+            calories=meal.calories,
+            proteins=meal.proteins,
+            fats=meal.fats,
+            carbs=meal.carbs,
+            date=date.today()
+        )
+
+        db.add(new_meal)
+        await db.execute(meal_rollup_statement(new_meal))
+        await db.commit()
+
+        return {"message": "UserMeal saved successfully", "data": meal.dict()}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserMealsRouter.get("/meals", status_code=200, response_model=list[MealResponse])
+async def get_meals(response: Response, start: Optional[str] = None, end: Optional[str] = None,
+                    cursor: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+                    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        result = await db.execute(
+            select(*MEAL_COLUMNS)
+            .where(*get_meals_page_filters(user.uuid, start, end, cursor))
+            .order_by(Meal.date.desc(), Meal.uuid.desc())
+            .limit(limit)
+        )
+        meals = result.all()
+
+        set_next_cursor(response, meals, limit)
+        return meals
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserMealsRouter.delete("/meals/{uuid}", response_model=MessageResponse)
+async def delete_meal(uuid: str, db: AsyncSession = Depends(get_async_db)):
+    try:
+        meal = (await db.execute(delete_meal_statement(Meal.uuid == uuid))).first()
+        if not meal:
+            raise HTTPException(status_code=404, detail="Meal not found")
+        await db.execute(meal_rollup_statement(meal, -1))
+        await db.commit()
+        return {"message": "Meal deleted successfully"}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.UserOptionsController import (
+    UserOptionsSchema, UserOptionsResponse, insert_user_options_statement, update_user_options_statement
+)
+from lib.database.config import get_async_db
+from lib.database.models import UserOptions
+from lib.utils.RecommendationCacheUtils import invalidate_recommendations
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.UserMacrosUtils import calculate_user_macros, upsert_user_macros_statement, user_macros_row
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncUserOptionsRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncUserOptionsRouter.post("/save-user-options", status_code=201, response_model=DataResponse[UserOptionsSchema])
+async def save_user_options(user_options: UserOptionsSchema, db: AsyncSession = Depends(get_async_db),
+                            token: str = Depends(oauth2_scheme)):
+    try:
+        user = await get_user_from_token_async(token, db)
+
+        result = await db.execute(insert_user_options_statement(user.uuid, user_options))
+        if result.first() is None:
+            raise HTTPException(status_code=400, detail="UserOptions already exist for this user.")
+
+        await saveOrUpdateUserMacrosAsync(db, user, calculate_user_macros(user, user_options))
+        await db.commit()
+        invalidate_recommendations(user.uuid)
+
+        return {"message": "UserOptions saved successfully", "data": user_options.dict()}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserOptionsRouter.post("/update-user-options", status_code=201,
+                             response_model=DataResponse[UserOptionsSchema])
+async def update_user_options(user_options: UserOptionsSchema, db: AsyncSession = Depends(get_async_db),
+                              token: str = Depends(oauth2_scheme)):
+    try:
+        user = await get_user_from_token_async(token, db)
+
+        result = await db.execute(update_user_options_statement(user.uuid, user_options))
+        if result.rowcount == 0:
+            raise HTTPException(status_code=400, detail="UserOptions not found for this user.")
+
+        await saveOrUpdateUserMacrosAsync(db, user, calculate_user_macros(user, user_options))
+        await db.commit()
+        invalidate_recommendations(user.uuid)
+
+        return {"message": "UserOptions updated successfully", "data": user_options.dict()}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserOptionsRouter.get("/get-user-options", status_code=200, response_model=UserOptionsResponse)
+async def get_user_options(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        user = await get_user_from_token_async(token, db)
+
+        user_options = await db.get(UserOptions, user.uuid)
+        if not user_options:
+            raise HTTPException(status_code=404, detail="UserOptions not found for this user.")
+
+        return {
+            "email": user.email,
+            "gender": user_options.gender,
+            "height": user_options.height,
+            "weight": user_options.weight,
+            "weightGoal": user_options.weightGoal,
+            "activityLevel": user_options.activityLevel,
+            "calorieIntake": user_options.caloriesIntake,
+            "age": user_options.age
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+async def saveOrUpdateUserMacrosAsync(db, user, user_macros):
+    await db.execute(upsert_user_macros_statement([{**user_macros_row(user_macros), "userUuid": user.uuid}]))
@@ -0,0 +1,103 @@
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.UserWaterIntakeController import (
+    UserWaterSchema, WaterIntakeResponse, WaterRecommendationResponse, WATER_INTAKE_COLUMNS
+)
+from lib.database.config import get_async_db
+from lib.database.models import UserOptions, WaterIntake
+from lib.utils.DailyRollupUtils import water_rollup_statement
+from lib.utils.DateUtils import get_dates
+from lib.utils.RecommendationCacheUtils import get_cached_recommendations, cache_recommendations
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncUserWaterIntakesRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncUserWaterIntakesRouter.post("/add_water_intake", response_model=DataResponse[WaterIntakeResponse])
+async def add_water_intake(water_intake: UserWaterSchema, db: AsyncSession = Depends(get_async_db),
+                           token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        user_options = await db.get(UserOptions, user.uuid)
+        if not user_options:
+            raise HTTPException(status_code=404, detail="User options not found")
+
+        # Log the water intake
+        new_intake = WaterIntake(userUuid=user.uuid,
+                                 currentIntake=water_intake.ml,
+                                 date=date.today())
+        db.add(new_intake)
+        await db.flush()
+        await db.execute(water_rollup_statement(new_intake))
+        data = WaterIntakeResponse.model_validate(new_intake)
+        await db.commit()
+
+        return {"message": "Water intake saved successfully", "data": data}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserWaterIntakesRouter.get("/water_intakes", response_model=list[WaterIntakeResponse])
+async def get_water_intakes(day: str, db: AsyncSession = Depends(get_async_db),
+                            token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        start_of_day, end_of_day = get_dates(day)
+
+        result = await db.execute(select(*WATER_INTAKE_COLUMNS).where(
+            WaterIntake.userUuid == user.uuid,
+            WaterIntake.date >= start_of_day,
+            WaterIntake.date <= end_of_day
+        ))
+
+        return result.all()
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserWaterIntakesRouter.get("/recommended_water_intake", status_code=200,
+                                 response_model=DataResponse[WaterRecommendationResponse])
+async def recommended_water_intake(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        recommendations = get_cached_recommendations(user.uuid)
+        if recommendations is None:
+            user_options = await db.get(UserOptions, user.uuid)
+            if not user_options:
+                raise HTTPException(status_code=404, detail="User options not found")
+
+            recommendations = cache_recommendations(user.uuid, user_options)
+
+        water_intake = recommendations["waterMl"]
+
+        return {
+            "message": "Recommended UserMacros calculated successfully",
+            "data": {
+                "ml": water_intake,
+            }
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.controllers.UserWeightController import (
+    UserWeightCreate, UserWeightResponse, get_weight_filters, upsert_user_weights_statement
+)
+from lib.database.config import get_async_db
+from lib.database.models import UserWeight
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.UserUtils import get_user_from_token_async
+
+asyncUserWeightRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@asyncUserWeightRouter.post("/add_weight", status_code=201, response_model=DataResponse[UserWeightCreate])
+async def add_user_weight(weight: UserWeightCreate, db: AsyncSession = Depends(get_async_db),
+                          token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        await db.execute(upsert_user_weights_statement(user.uuid, [
+            {"date": datetime.strptime(weight.date, "%Y-%m-%d").date(), "weight": weight.weight}
+        ]))
+        await db.commit()
+
+        return {"message": "Weight added successfully", "data": weight.dict()}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@asyncUserWeightRouter.get("/weights", response_model=list[UserWeightResponse])
+async def get_user_weights(start_date: Optional[str] = None, end_date: Optional[str] = None,
+                           db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await get_user_from_token_async(token, db)
+
+        result = await db.execute(
+            select(UserWeight.date, UserWeight.weight)
+            .where(*get_weight_filters(user.uuid, start_date, end_date))
+            .order_by(UserWeight.date)
+        )
+
+        return result.all()
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,20 +1,29 @@
+import logging
 import uuid
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
-from passlib.hash import bcrypt
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from lib.database.config import get_db
 from lib.database.models import User
+from lib.utils.PasswordUtils import hash_password, verify_password
+from lib.utils.ReadRoutingUtils import mark_recent_write
+from lib.utils.UserUtils import invalidate_cached_user, get_user_from_token
 
 SECRET_KEY = "super-secret-access-token-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180
 
 authRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 class RegisterSchema(BaseModel):
     email: str
@@ -34,13 +43,44 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def create_user_access_token(user: User):
+    # "uuid" lets requests resolve the user by primary key, "ver" lets tokens be revoked
+    return create_access_token(data={"sub": user.email, "uuid": str(user.uuid), "ver": user.tokenVersion or 0})
+
+def find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+
+def release_after(db: Session, function, *args):
+    # Closing in the same worker call matters: a separate run_in_threadpool(db.close) queues behind requests
+    # that are themselves waiting for a pooled connection
+    try:
+        return function(db, *args)
+    finally:
+        db.close()
+
+
+def save_user(db: Session, user: User):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def save_password(db: Session, user: User, hashed_password: str):
+    db.execute(update(User).where(User.uuid == user.uuid).values(password=hashed_password))
+    db.commit()
+
+
+# async so the bcrypt wait happens on the event loop; the blocking DB calls still go to the threadpool
 @authRouter.post("/register", response_model=TokenSchema, status_code=201)
-def register(user_data: RegisterSchema, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+async def register(user_data: RegisterSchema, db: Session = Depends(get_db)):
+    # Hand the connection back to the pool while the password is hashed, the session reconnects on next use
+    existing_user = await run_in_threadpool(release_after, db, find_user_by_email, user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email is already registered")
 
-    hashed_password = bcrypt.hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     new_user_uuid = str(uuid.uuid4())
 
     new_user = User(
@@ -49,19 +89,50 @@ def register(user_data: RegisterSchema, db: Session = Depends(get_db)):
         password=hashed_password,
         registeredAt=datetime.utcnow()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        new_user = await run_in_threadpool(save_user, db, new_user)
+    except IntegrityError:
+        # A concurrent registration with the same email committed between the check and this insert
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=400, detail="Email is already registered")
+    invalidate_cached_user(uuid=new_user.uuid, email=new_user.email)
+    # The request carries no token for the middleware to key on, and the first reads follow immediately
+    mark_recent_write(new_user.uuid)
 
-    access_token = create_access_token(data={"sub": new_user.email})
+    access_token = create_user_access_token(new_user)
     return {"accessToken": access_token, "token_type": "bearer"}
 
 @authRouter.post("/login", response_model=TokenSchema)
-def login(user_data: LoginSchema, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_data.email).first()
-    if not user or not bcrypt.verify(user_data.password, user.password):
+async def login(user_data: LoginSchema, db: Session = Depends(get_db)):
+    # As in register; user keeps its loaded columns, save_password only needs its uuid
+    user = await run_in_threadpool(release_after, db, find_user_by_email, user_data.email)
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token(data={"sub": user.email, "uuid": str(user.uuid)})
-    print(access_token)
+    is_valid, upgraded_hash = await verify_password(user_data.password, user.password)
+    if not is_valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    # Re-hash with the current cost factor while we still have the plain password
+    if upgraded_hash:
+        await run_in_threadpool(save_password, db, user, upgraded_hash)
+
+    access_token = create_user_access_token(user)
+    logger.debug("Issued access token for user %s", user.uuid)
+    return {"accessToken": access_token, "token_type": "bearer"}
+
+@authRouter.post("/revoke-tokens", response_model=TokenSchema)
+def revoke_tokens(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    user = get_user_from_token(token, db)
+
+    # Invalidates every token issued so far; the caller gets a fresh one
+    token_version = db.execute(
+        update(User).where(User.uuid == user.uuid)
+        .values(tokenVersion=User.tokenVersion + 1)
+        .returning(User.tokenVersion)
+    ).scalar_one()
+    db.commit()
+    invalidate_cached_user(uuid=user.uuid, email=user.email)
+
+    access_token = create_access_token(data={"sub": user.email, "uuid": str(user.uuid), "ver": token_version})
     return {"accessToken": access_token, "token_type": "bearer"}
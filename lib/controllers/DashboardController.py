@@ -0,0 +1,123 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel
+from sqlalchemy import and_, select, true
+from sqlalchemy.orm import Session
+
+from lib.controllers.NutritionSummaryController import MACRO_FIELDS, MacroTotals
+from lib.database.models import User, UserMacros, UserDailyRollup, UserOptions, UserWeight
+from lib.utils.DateUtils import parse_dates
+from lib.utils.RecommendationCacheUtils import OPTIONS_FIELDS, get_cached_recommendations, cache_recommendations
+from lib.utils.ReadRoutingUtils import get_read_db
+from lib.utils.UserUtils import get_user_from_token
+
+dashboardRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+class DashboardWater(BaseModel):
+    ml: int
+    recommendedMl: Optional[int]
+
+
+class DashboardWeight(BaseModel):
+    weight: Optional[float]
+    date: date
+
+
+class DashboardResponse(BaseModel):
+    date: str
+    target: Optional[MacroTotals]
+    consumed: MacroTotals
+    remaining: Optional[MacroTotals]
+    recommended: Optional[MacroTotals]
+    mealCount: int
+    water: DashboardWater
+    latestWeight: Optional[DashboardWeight]
+
+
+def dashboard_query(user_uuid: str, day: date):
+    # Everything the home screen needs in one round trip: targets, the day's rollup,
+    # the latest weight up to that day and the options recommendations are computed from
+    latest_weight = select(UserWeight.weight, UserWeight.date).where(
+        UserWeight.userUuid == User.uuid,
+        UserWeight.date <= day,
+    ).order_by(UserWeight.date.desc()).limit(1).lateral("latest_weight")
+
+    return select(
+        UserMacros.userUuid.label("macrosUserUuid"),
+        *[getattr(UserMacros, field).label(f"target_{field}") for field in MACRO_FIELDS],
+        *[getattr(UserDailyRollup, field).label(f"consumed_{field}") for field in MACRO_FIELDS],
+        UserDailyRollup.waterMl,
+        UserDailyRollup.mealCount,
+        UserOptions.userUuid.label("optionsUserUuid"),
+        *[getattr(UserOptions, field) for field in OPTIONS_FIELDS],
+        latest_weight.c.weight.label("latestWeight"),
+        latest_weight.c.date.label("latestWeightDate"),
+    ).select_from(User).outerjoin(
+        UserMacros, UserMacros.userUuid == User.uuid
+    ).outerjoin(
+        UserDailyRollup, and_(UserDailyRollup.userUuid == User.uuid, UserDailyRollup.date == day)
+    ).outerjoin(
+        UserOptions, UserOptions.userUuid == User.uuid
+    ).outerjoin(
+        latest_weight, true()
+    ).where(User.uuid == user_uuid)
+
+
+def build_dashboard(row, day: date, recommendations: dict | None):
+    consumed = {field: getattr(row, f"consumed_{field}") or 0 for field in MACRO_FIELDS}
+
+    target = None
+    remaining = None
+    if row.macrosUserUuid is not None:
+        target = {field: getattr(row, f"target_{field}") for field in MACRO_FIELDS}
+        remaining = {
+            field: target[field] - consumed[field] if target[field] is not None else None for field in MACRO_FIELDS
+        }
+
+    return {
+        "date": day.isoformat(),
+        "target": target,
+        "consumed": consumed,
+        "remaining": remaining,
+        "recommended": {field: recommendations[field] for field in MACRO_FIELDS}
+        if recommendations and recommendations["calories"] is not None else None,
+        "mealCount": row.mealCount or 0,
+        "water": {
+            "ml": row.waterMl or 0,
+            "recommendedMl": recommendations["waterMl"] if recommendations else None,
+        },
+        "latestWeight": {"weight": row.latestWeight, "date": row.latestWeightDate}
+        if row.latestWeightDate is not None else None,
+    }
+
+
+@dashboardRouter.get("/dashboard", status_code=200, response_model=DashboardResponse)
+def get_dashboard(day: Optional[str] = None, db: Session = Depends(get_read_db),
+                  token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        target_date, _ = parse_dates(day, None)
+        target_date = target_date or date.today()
+
+        row = db.execute(dashboard_query(user.uuid, target_date)).one()
+
+        # Served from memory until the user's options change, computed from the row otherwise
+        recommendations = get_cached_recommendations(user.uuid)
+        if recommendations is None and row.optionsUserUuid is not None:
+            recommendations = cache_recommendations(user.uuid, row)
+
+        return build_dashboard(row, target_date, recommendations)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
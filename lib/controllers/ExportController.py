@@ -0,0 +1,64 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+
+from lib.database.config import SessionLocal, ReplicaSessionLocal, is_replica_usable
+from lib.utils.DateUtils import parse_dates
+from lib.utils.ExportUtils import (
+    EXPORT_TABLES, EXPORT_MEDIA_TYPES, get_export_format, accepts_gzip, iter_export_chunks
+)
+from lib.utils.ReadRoutingUtils import get_read_db
+from lib.utils.UserUtils import get_user_from_token
+
+exportRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+@exportRouter.get("/export/{table}", status_code=200, response_class=StreamingResponse)
+def export_history(
+        request: Request,
+        table: str,
+        export_format: Optional[str] = Query(None, alias="format"),
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        db: Session = Depends(get_read_db),
+        token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        if table not in EXPORT_TABLES:
+            raise HTTPException(status_code=404, detail=f"Unknown export: {table}. Use one of {', '.join(EXPORT_TABLES)}.")
+
+        export_format = get_export_format(request, export_format)
+        start_date, end_date = parse_dates(start, end)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+    # Full history is a good fit for the replica, a few seconds of lag don't matter for an export
+    session_factory = ReplicaSessionLocal if ReplicaSessionLocal is not None and is_replica_usable() else SessionLocal
+    gzip = accepts_gzip(request)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{table}.{export_format}"',
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    # The generator is iterated in the threadpool, row batches are sent as soon as they are fetched
+    return StreamingResponse(
+        iter_export_chunks(session_factory, table, export_format, gzip,
+                           user_uuid=user.uuid, start_date=start_date, end_date=end_date),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
@@ -0,0 +1,94 @@
+import logging
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from lib.controllers.RecipesController import RecipeListItem
+from lib.database.config import get_db
+from lib.utils.FavouriteRecipesUtils import (
+    favourite_recipes_query, add_favourite_statement, remove_favourite_statement
+)
+from lib.utils.PaginationUtils import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, encode_cursor, decode_cursor_values
+from lib.utils.ReadRoutingUtils import get_read_db
+from lib.utils.ResponseUtils import MessageResponse
+from lib.utils.UserUtils import get_user_from_token
+
+favouriteRecipesRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
+
+
+@favouriteRecipesRouter.get("/favourite_recipes", status_code=200, response_model=list[RecipeListItem])
+def get_favourite_recipes(
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        db: Session = Depends(get_read_db),
+        token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        after_recipe_uuid = decode_cursor_values(cursor, 1)[0] if cursor else None
+        recipes = db.execute(favourite_recipes_query(user.uuid, after_recipe_uuid, limit)).all()
+
+        # Ordered by recipe uuid, so the next page continues after the last one returned
+        if len(recipes) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(recipes[-1].uuid)
+        return recipes
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@favouriteRecipesRouter.post("/favourite_recipes/{recipe_uuid}", status_code=201, response_model=MessageResponse)
+def add_favourite_recipe(recipe_uuid: str, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        db.execute(add_favourite_statement(str(uuid.uuid4()), user.uuid, recipe_uuid))
+        db.commit()
+
+        return {"message": "Recipe added to favourites"}
+
+    except IntegrityError:
+        # Duplicates are skipped by the insert, so this is the recipe foreign key
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    except HTTPException as e:
+        logger.info("add_favourite_recipe rejected: %s", e.detail)
+        raise e
+    except Exception as e:
+        db.rollback()
+        logger.exception("add_favourite_recipe failed")
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@favouriteRecipesRouter.delete("/favourite_recipes/{recipe_uuid}", response_model=MessageResponse)
+def remove_favourite_recipe(recipe_uuid: str, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        result = db.execute(remove_favourite_statement(user.uuid, recipe_uuid))
+        if result.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Favourite recipe not found")
+        db.commit()
+
+        return {"message": "Recipe removed from favourites"}
+
+    except HTTPException as e:
+        logger.info("remove_favourite_recipe rejected: %s", e.detail)
+        raise e
+    except Exception as e:
+        db.rollback()
+        logger.exception("remove_favourite_recipe failed")
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
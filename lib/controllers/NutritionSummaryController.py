@@ -0,0 +1,185 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from lib.database.models import Meal, UserMacros, UserDailyRollup
+from lib.utils.DailyRollupUtils import ROLLUP_FIELDS
+from lib.utils.DateUtils import parse_dates
+from lib.utils.ReadRoutingUtils import get_read_db
+from lib.utils.UserUtils import get_user_from_token
+
+nutritionSummaryRouter = APIRouter()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+MACRO_FIELDS = ("calories", "proteins", "fats", "carbs")
+DEFAULT_SUMMARY_DAYS = 30
+MAX_SUMMARY_DAYS = 366
+
+
+class MacroTotals(BaseModel):
+    calories: Optional[int]
+    proteins: Optional[int]
+    fats: Optional[int]
+    carbs: Optional[int]
+
+
+class DailySummary(BaseModel):
+    date: str
+    consumed: MacroTotals
+    target: Optional[MacroTotals]
+    remaining: Optional[MacroTotals]
+    mealCount: int
+    byMealType: dict[str, MacroTotals]
+
+
+class DailyHistoryEntry(BaseModel):
+    date: str
+    calories: int
+    proteins: int
+    fats: int
+    carbs: int
+    waterMl: int
+    mealCount: int
+
+
+def empty_totals():
+    return {field: 0 for field in MACRO_FIELDS}
+
+
+def get_macro_targets(db: Session, user_uuid: str):
+    user_macros = db.query(UserMacros).filter(UserMacros.userUuid == user_uuid).first()
+    if not user_macros:
+        return None
+
+    return {field: getattr(user_macros, field) for field in MACRO_FIELDS}
+
+
+def summarize_meals(db: Session, user_uuid: str, start_date: date, end_date: date):
+    # One aggregate over the user's meals; Postgres returns a row per (date, mealType)
+    rows = db.query(
+        Meal.date,
+        Meal.mealType,
+        func.coalesce(func.sum(Meal.calories), 0).label("calories"),
+        func.coalesce(func.sum(Meal.proteins), 0).label("proteins"),
+        func.coalesce(func.sum(Meal.fats), 0).label("fats"),
+        func.coalesce(func.sum(Meal.carbs), 0).label("carbs"),
+        func.count().label("mealCount"),
+    ).filter(
+        Meal.userUuid == user_uuid,
+        Meal.date >= start_date,
+        Meal.date <= end_date,
+    ).group_by(Meal.date, Meal.mealType).all()
+
+    targets = get_macro_targets(db, user_uuid)
+    days = {}
+    for offset in range((end_date - start_date).days + 1):
+        day = start_date + timedelta(days=offset)
+        days[day] = {
+            "date": day.isoformat(),
+            "consumed": empty_totals(),
+            "target": targets,
+            "remaining": dict(targets) if targets else None,
+            "mealCount": 0,
+            "byMealType": {},
+        }
+
+    for row in rows:
+        summary = days[row.date]
+        meal_type = row.mealType.value if row.mealType else None
+        summary["byMealType"][meal_type] = {field: int(getattr(row, field)) for field in MACRO_FIELDS}
+        summary["mealCount"] += row.mealCount
+        for field in MACRO_FIELDS:
+            summary["consumed"][field] += int(getattr(row, field))
+            if targets and targets[field] is not None:
+                summary["remaining"][field] = targets[field] - summary["consumed"][field]
+
+    return list(days.values())
+
+
+def parse_summary_range(start: Optional[str], end: Optional[str]):
+    start_date, end_date = parse_dates(start, end)
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_SUMMARY_DAYS - 1)
+
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start must not be after end.")
+    if (end_date - start_date).days >= MAX_SUMMARY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_SUMMARY_DAYS} days.")
+
+    return start_date, end_date
+
+
+@nutritionSummaryRouter.get("/nutrition-summary/daily", status_code=200, response_model=DailySummary)
+def get_daily_summary(day: Optional[str] = None, db: Session = Depends(get_read_db),
+                      token: str = Depends(oauth2_scheme)):
+    try:
+        user = get_user_from_token(token, db)
+
+        target_date, _ = parse_dates(day, None)
+        target_date = target_date or date.today()
+
+        return summarize_meals(db, user.uuid, target_date, target_date)[0]
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@nutritionSummaryRouter.get("/nutrition-summary", status_code=200, response_model=list[DailySummary])
+def get_summary(start: Optional[str] = None, end: Optional[str] = None, db: Session = Depends(get_read_db),
+                token: str = Depends(oauth2_scheme)):
+    try:
+        user = get_user_from_token(token, db)
+
+        start_date, end_date = parse_summary_range(start, end)
+
+        return summarize_meals(db, user.uuid, start_date, end_date)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@nutritionSummaryRouter.get("/nutrition-summary/history", status_code=200, response_model=list[DailyHistoryEntry])
+def get_history(start: Optional[str] = None, end: Optional[str] = None, db: Session = Depends(get_read_db),
+                token: str = Depends(oauth2_scheme)):
+    try:
+        user = get_user_from_token(token, db)
+
+        start_date, end_date = parse_summary_range(start, end)
+
+        # Reads the incrementally maintained rollup, one row per logged day
+        rollups = db.query(UserDailyRollup).filter(
+            UserDailyRollup.userUuid == user.uuid,
+            UserDailyRollup.date >= start_date,
+            UserDailyRollup.date <= end_date,
+        ).all()
+        rollups_by_date = {rollup.date: rollup for rollup in rollups}
+
+        history = []
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
+            rollup = rollups_by_date.get(day)
+            entry = {"date": day.isoformat()}
+            entry.update({field: getattr(rollup, field) if rollup else 0 for field in ROLLUP_FIELDS})
+            history.append(entry)
+
+        return history
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from lib.controllers.UserOptionsController import get_user_from_token
-from lib.database.config import get_db
 from lib.database.models import UserOptions, User, Recipe
+from lib.utils.FavouriteRecipesUtils import favourite_uuids_query, recipe_list_response
+from lib.utils.ReadRoutingUtils import get_read_db
+from lib.utils.RecipeCatalogueUtils import get_recipe_catalogue, invalidate_recipe_catalogue, is_recipe_cache_admin
+from lib.utils.RecipeSuggestionUtils import (
+    DEFAULT_SUGGESTION_LIMIT, MAX_SUGGESTION_LIMIT, remaining_macros_query, build_suggestions
+)
+from lib.utils.ResponseUtils import RowModel, MessageResponse
 
 recipesRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# The recipe list is public, a token only adds the caller's isFavourite flags
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 class UserOptionsSchema(BaseModel):
     gender: str
     height: str
@@ -18,14 +29,95 @@ class UserOptionsSchema(BaseModel):
     activityLevel: str
     age: str
 
-@recipesRouter.get("/recipes", status_code=200)
-def get_recipes( db: Session = Depends(get_db)):
-    recipes = db.query(Recipe).all()
 
-    if not recipes:
-        return []
+class RecipeListItem(RowModel):
+    uuid: str
+    title: Optional[str]
+    calories: Optional[int]
+    proteins: Optional[int]
+    fats: Optional[int]
+    carbs: Optional[int]
+    mealType: Optional[str]
+    cookingTime: Optional[str]
+    coverImage: Optional[str]
+    isPopular: Optional[bool]
+
+
+class RecipeResponse(RecipeListItem):
+    description: Optional[str]
+
+
+class RecipeCatalogueItem(RecipeListItem):
+    isFavourite: bool
+
+
+class RecipeSuggestion(RecipeCatalogueItem):
+    distance: float
+
+
+class RemainingMacros(BaseModel):
+    calories: int
+    proteins: int
+    fats: int
+    carbs: int
+
+
+class RecipeSuggestionsResponse(BaseModel):
+    remaining: RemainingMacros
+    recipes: list[RecipeSuggestion]
+
+
+@recipesRouter.get("/recipes", status_code=200, response_model=list[RecipeCatalogueItem])
+def get_recipes(if_none_match: Optional[str] = Header(None),
+                db: Session = Depends(get_read_db), token: Optional[str] = Depends(optional_oauth2_scheme)):
+    catalogue = get_recipe_catalogue(db)
+
+    # One set lookup per request, the flags are then filled in from memory
+    favourites = set()
+    if token:
+        user = get_user_from_token(token, db)
+        favourites = set(db.execute(favourite_uuids_query(user.uuid)).scalars())
+
+    # The catalogue is already encoded, skip per-request validation and serialization
+    return recipe_list_response(catalogue, favourites, if_none_match)
+
+
+# Declared before /recipes/{uuid} so "suggest" isn't taken for a recipe uuid
+@recipesRouter.get("/recipes/suggest", status_code=200, response_model=RecipeSuggestionsResponse)
+def suggest_recipes(meal_type: Optional[str] = Query(None, alias="mealType"),
+                    limit: int = Query(DEFAULT_SUGGESTION_LIMIT, ge=1, le=MAX_SUGGESTION_LIMIT),
+                    db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        row = db.execute(remaining_macros_query(user.uuid, date.today())).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="UserMacros not found for this user.")
+
+        favourites = set(db.execute(favourite_uuids_query(user.uuid)).scalars())
+        return build_suggestions(get_recipe_catalogue(db), row, meal_type, limit, favourites)
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+# Each worker process holds its own catalogue, call this once per worker after changing the Recipe table
+@recipesRouter.post("/recipes/cache/invalidate", response_model=MessageResponse)
+def invalidate_recipes_cache(x_admin_token: Optional[str] = Header(None)):
+    if not is_recipe_cache_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Not allowed to invalidate the recipe cache")
 
-    return recipes
+    invalidate_recipe_catalogue()
+    return {"message": "Recipe catalogue invalidated"}
 
 
+@recipesRouter.get("/recipes/{uuid}", status_code=200, response_model=RecipeResponse)
+def get_recipe(uuid: str, db: Session = Depends(get_read_db)):
+    recipe = db.get(Recipe, uuid)
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
 
+    return recipe
@@ -1,3 +1,6 @@
+import logging
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
@@ -6,11 +9,15 @@ from sqlalchemy.orm import Session
 from lib.database.config import get_db
 from lib.database.models import UserMacros, UserOptions, Meal
 from lib.utils.DateUtils import get_dates
-from lib.utils.UserMacrosUtils import calculate_user_macros
+from lib.utils.RecommendationCacheUtils import get_cached_recommendations, cache_recommendations
+from lib.utils.LoggingUtils import redact
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.ReadRoutingUtils import get_read_db
 from lib.utils.UserUtils import get_user_from_token
 
 userMacrosRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 
 class UserMacrosSchema(BaseModel):
@@ -20,11 +27,18 @@ class UserMacrosSchema(BaseModel):
     fats: int
 
 
-@userMacrosRouter.post("/update-user_macros", status_code=201)
+class UserMacrosResponse(BaseModel):
+    calories: Optional[int]
+    proteins: Optional[int]
+    carbs: Optional[int]
+    fats: Optional[int]
+
+
+@userMacrosRouter.post("/update-user_macros", status_code=201, response_model=DataResponse[UserMacrosSchema])
 def update_user_macros(user_macros: UserMacrosSchema, db: Session = Depends(get_db),
                        token: str = Depends(oauth2_scheme)):
     try:
-        print(token)
+        logger.debug("update-user_macros token %s", redact(token))
 
         # Get user from token
         user = get_user_from_token(token, db)
@@ -53,10 +67,10 @@ def update_user_macros(user_macros: UserMacrosSchema, db: Session = Depends(get_
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userMacrosRouter.get("/get-user-macros", status_code=200)
-def get_user_macros(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+@userMacrosRouter.get("/get-user-macros", status_code=200, response_model=UserMacrosResponse)
+def get_user_macros(db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
     try:
-        print(token)
+        logger.debug("get-user-macros token %s", redact(token))
         # Get user from token
         user = get_user_from_token(token, db)
 
@@ -65,7 +79,7 @@ def get_user_macros(db: Session = Depends(get_db), token: str = Depends(oauth2_s
         if not user_macros:
             raise HTTPException(status_code=404, detail="UserMacros not found for this user.")
 
-        print(user_macros)
+        logger.debug("Loaded macros for user %s", user.uuid)
         # Return the retrieved UserMacros
         return  {
                 "calories": user_macros.calories,
@@ -81,28 +95,32 @@ def get_user_macros(db: Session = Depends(get_db), token: str = Depends(oauth2_s
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userMacrosRouter.get("/recommended-user-macros", status_code=200)
-def recommended_user_macros(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+@userMacrosRouter.get("/recommended-user-macros", status_code=200, response_model=DataResponse[UserMacrosSchema])
+def recommended_user_macros(db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
-        # Retrieve UserOptions for the user
-        user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
-        if not user_options:
-            raise HTTPException(status_code=404, detail="UserOptions not found for this user.")
+        # Served from memory until the user's options change
+        user_macros = get_cached_recommendations(user.uuid)
+        if user_macros is None:
+            user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
+            if not user_options:
+                raise HTTPException(status_code=404, detail="UserOptions not found for this user.")
+
+            user_macros = cache_recommendations(user.uuid, user_options)
 
-        # Calculate recommended macros using the provided function
-        user_macros = calculate_user_macros(user, user_options)
+        if user_macros["calories"] is None:
+            raise HTTPException(status_code=400, detail="UserOptions are incomplete for this user.")
 
         # Return the recommended macros
         return {
             "message": "Recommended UserMacros calculated successfully",
             "data": {
-                "calories": user_macros.calories,
-                "proteins": user_macros.proteins,
-                "carbs": user_macros.carbs,
-                "fats": user_macros.fats
+                "calories": user_macros["calories"],
+                "proteins": user_macros["proteins"],
+                "carbs": user_macros["carbs"],
+                "fats": user_macros["fats"]
             }
         }
 
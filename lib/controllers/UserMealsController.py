@@ -1,18 +1,28 @@
+import logging
 import uuid
 from datetime import date
+from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, Body
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from lib.database.config import get_db
 from lib.database.models import MealType, Meal
-from lib.utils.DateUtils import get_dates
+from lib.utils.DailyRollupUtils import meal_rollup_statement, rollup_delta_statement, delete_meal_statement
+from lib.utils.DateUtils import get_dates, parse_dates
+from lib.utils.PaginationUtils import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, encode_cursor, decode_cursor
+from lib.utils.LoggingUtils import redact
+from lib.utils.ResponseUtils import RowModel, MessageResponse, DataResponse
+from lib.utils.ReadRoutingUtils import get_read_db
 from lib.utils.UserUtils import get_user_from_token
 
 userMealsRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 
 class MealCreate(BaseModel):
@@ -25,15 +35,77 @@ class MealCreate(BaseModel):
     carbs: int
 
 
+class MealResponse(RowModel):
+    uuid: str
+    title: Optional[str]
+    fats: Optional[int]
+    proteins: Optional[int]
+    calories: Optional[int]
+    carbs: Optional[int]
+    mealType: MealType
+    weight: Optional[int]
+    date: Optional[date]
+    userUuid: Optional[str]
+
+
+# Selected as plain column tuples so listing meals doesn't build ORM instances
+MEAL_COLUMNS = (
+    Meal.uuid, Meal.title, Meal.fats, Meal.proteins, Meal.calories, Meal.carbs, Meal.mealType, Meal.weight,
+    Meal.date, Meal.userUuid,
+)
+
+MAX_BULK_MEALS = 500
+
+
+class MealBulkItem(MealCreate):
+    # Client-generated uuid, makes retrying a bulk upload idempotent
+    uuid: Optional[str] = None
+    mealDate: Optional[date] = Field(default=None, alias="date")
+
+    @field_validator("mealType")
+    @classmethod
+    def validate_meal_type(cls, value):
+        # The mealtype column stores enum names, so "breakfast" is saved as "Breakfast"
+        if value in MealType.__members__:
+            return value
+        try:
+            return MealType(value).name
+        except ValueError:
+            raise ValueError(f"Unknown meal type: {value}")
+
+    @field_validator("uuid")
+    @classmethod
+    def validate_uuid(cls, value):
+        return str(uuid.UUID(value)) if value is not None else None
+
+
+class MealBulkError(BaseModel):
+    field: str
+    message: str
+
+
+class MealBulkResult(BaseModel):
+    index: int
+    uuid: Optional[str]
+    status: str
+    errors: Optional[list[MealBulkError]] = None
+
+
+class MealBulkResponse(BaseModel):
+    message: str
+    created: int
+    results: list[MealBulkResult]
+
+
 # Endpoint to create a meal with user inputted macros
-@userMealsRouter.post("/create_meal", status_code=201)
+@userMealsRouter.post("/create_meal", status_code=201, response_model=DataResponse[MealCreate])
 def create_meal(meal: MealCreate, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
     try:
-        print(token)
+        logger.debug("create_meal token %s", redact(token))
 
         # Get user from token
         user = get_user_from_token(token, db)
-        print(user)
+        logger.debug("create_meal for user %s", user.uuid)
         new_meal = Meal(
             userUuid=user.uuid,
             uuid=str(uuid.uuid4()),
@@ -48,34 +120,144 @@ def create_meal(meal: MealCreate, db: Session = Depends(get_db), token: str = De
         )
 
         db.add(new_meal)
+        db.execute(meal_rollup_statement(new_meal))
         db.commit()
 
         return {"message": "UserMeal saved successfully", "data": meal.dict()}
 
     except HTTPException as e:
-        print(e)
+        logger.info("create_meal rejected: %s", e.detail)
         raise e
     except Exception as e:
         db.rollback()
-        print(e)
+        logger.exception("create_meal failed")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userMealsRouter.get("/meals", status_code=200)
+def get_meals_page_filters(user_uuid: str, start: Optional[str], end: Optional[str], cursor: Optional[str]):
+    try:
+        start_date, end_date = parse_dates(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = [Meal.userUuid == user_uuid]
+    if start_date:
+        filters.append(Meal.date >= start_date)
+    if end_date:
+        filters.append(Meal.date <= end_date)
+    if cursor:
+        # Newest first, so the next page continues strictly below the last (date, uuid) returned
+        filters.append(tuple_(Meal.date, Meal.uuid) < decode_cursor(cursor))
+
+    return filters
+
+
+def set_next_cursor(response: Response, meals, limit: int):
+    if len(meals) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(meals[-1].date, meals[-1].uuid)
+
+
+@userMealsRouter.post("/create_meals_bulk", status_code=200, response_model=MealBulkResponse,
+                      response_model_exclude_unset=True)
+def create_meals_bulk(meals: list[Any] = Body(...), db: Session = Depends(get_db),
+                      token: str = Depends(oauth2_scheme)):
+    if len(meals) > MAX_BULK_MEALS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_MEALS} meals can be uploaded at once.")
+
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
+
+        # Validate every item up front so one bad row doesn't fail the whole upload
+        results = []
+        rows = {}
+        for index, item in enumerate(meals):
+            try:
+                meal = MealBulkItem.model_validate(item)
+            except ValidationError as e:
+                errors = [{"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+                          for error in e.errors()]
+                results.append({"index": index, "uuid": item.get("uuid") if isinstance(item, dict) else None,
+                                "status": "invalid", "errors": errors})
+                continue
+
+            meal_uuid = meal.uuid or str(uuid.uuid4())
+            results.append({"index": index, "uuid": meal_uuid, "status": "duplicate"})
+            if meal_uuid in rows:
+                continue
+
+            rows[meal_uuid] = {
+                "uuid": meal_uuid,
+                "userUuid": user.uuid,
+                "title": meal.title,
+                "weight": int(meal.weight),
+                "mealType": meal.mealType,
+                "calories": meal.calories,
+                "proteins": meal.proteins,
+                "fats": meal.fats,
+                "carbs": meal.carbs,
+                "date": meal.mealDate or date.today(),
+            }
+
+        created = set()
+        if rows:
+            # One multi-row INSERT; uuids that already exist are skipped so retries don't duplicate meals
+            created = set(db.execute(
+                insert(Meal).values(list(rows.values())).on_conflict_do_nothing(index_elements=["uuid"])
+                .returning(Meal.uuid)
+            ).scalars())
+
+            daily_totals = {}
+            for meal_uuid in created:
+                row = rows[meal_uuid]
+                totals = daily_totals.setdefault(row["date"], {"calories": 0, "proteins": 0, "fats": 0,
+                                                               "carbs": 0, "mealCount": 0})
+                for field in ("calories", "proteins", "fats", "carbs"):
+                    totals[field] += row[field]
+                totals["mealCount"] += 1
+
+            for day, totals in daily_totals.items():
+                db.execute(rollup_delta_statement(user.uuid, day, **totals))
+
+            db.commit()
+
+        for result in results:
+            if result["uuid"] in created:
+                result["status"] = "created"
+                created.discard(result["uuid"])
+
+        return {
+            "message": "UserMeals processed",
+            "created": sum(result["status"] == "created" for result in results),
+            "results": results,
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@userMealsRouter.get("/meals", status_code=200, response_model=list[MealResponse])
 def get_meals(
-        db: Session = Depends(get_db),
+        response: Response,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        db: Session = Depends(get_read_db),
         token: str = Depends(oauth2_scheme)
 ):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
+        meals = db.query(*MEAL_COLUMNS).filter(
+            *get_meals_page_filters(user.uuid, start, end, cursor)
+        ).order_by(Meal.date.desc(), Meal.uuid.desc()).limit(limit).all()
 
-        meals = db.query(Meal).filter(
-            Meal.userUuid == user.uuid,
-
-        ).all()
-
+        set_next_cursor(response, meals, limit)
         return meals
 
     except HTTPException as e:
@@ -84,19 +266,19 @@ def get_meals(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userMealsRouter.delete("/meals/{uuid}")
+@userMealsRouter.delete("/meals/{uuid}", response_model=MessageResponse)
 def delete_meal(uuid: str, db: Session = Depends(get_db)):
     try:
-        meal = db.query(Meal).filter(Meal.uuid == uuid).first()
+        meal = db.execute(delete_meal_statement(Meal.uuid == uuid)).first()
         if not meal:
             raise HTTPException(status_code=404, detail="Meal not found")
-        db.delete(meal)
+        db.execute(meal_rollup_statement(meal, -1))
         db.commit()
         return {"message": "Meal deleted successfully"}
     except HTTPException as e:
-        print(e)
+        logger.info("delete_meal rejected: %s", e.detail)
         raise e
     except Exception as e:
         db.rollback()
-        print(e)
+        logger.exception("delete_meal failed")
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -1,15 +1,27 @@
+import logging
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from lib.database.config import get_db
-from lib.database.models import UserOptions, UserMacros
-from lib.utils.UserMacrosUtils import calculate_user_macros, calculate_user_intake
+from lib.database.models import UserOptions
+from lib.utils.RecommendationCacheUtils import invalidate_recommendations
+from lib.utils.UserMacrosUtils import (
+    calculate_user_macros, calculate_user_intake, upsert_user_macros_statement, user_macros_row
+)
+from lib.utils.LoggingUtils import redact
+from lib.utils.ResponseUtils import DataResponse
+from lib.utils.ReadRoutingUtils import get_read_db
 from lib.utils.UserUtils import get_user_from_token
 
 userOptionsRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 
 class UserOptionsSchema(BaseModel):
@@ -21,35 +33,53 @@ class UserOptionsSchema(BaseModel):
     age: int
 
 
-@userOptionsRouter.post("/save-user-options", status_code=201)
+class UserOptionsResponse(BaseModel):
+    email: str
+    gender: Optional[str]
+    height: Optional[float]
+    weight: Optional[float]
+    weightGoal: Optional[str]
+    activityLevel: Optional[str]
+    calorieIntake: Optional[int]
+    age: Optional[int]
+
+
+def user_options_values(user_options: UserOptionsSchema):
+    return {
+        "gender": user_options.gender,
+        "height": user_options.height,
+        "weight": user_options.weight,
+        "weightGoal": user_options.weightGoal,
+        "activityLevel": user_options.activityLevel,
+        "age": user_options.age,
+        "caloriesIntake": calculate_user_intake(user_options),
+    }
+
+
+def insert_user_options_statement(user_uuid: str, user_options: UserOptionsSchema):
+    # Returns no row when the user already has options, instead of reading them first
+    return insert(UserOptions).values(
+        userUuid=user_uuid, **user_options_values(user_options)
+    ).on_conflict_do_nothing(index_elements=[UserOptions.userUuid]).returning(UserOptions.userUuid)
+
+
+def update_user_options_statement(user_uuid: str, user_options: UserOptionsSchema):
+    return update(UserOptions).where(UserOptions.userUuid == user_uuid).values(**user_options_values(user_options))
+
+
+@userOptionsRouter.post("/save-user-options", status_code=201, response_model=DataResponse[UserOptionsSchema])
 def save_user_options(user_options: UserOptionsSchema, db: Session = Depends(get_db),
                       token: str = Depends(oauth2_scheme)):
     try:
         user = get_user_from_token(token, db)
 
-        existing_user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
-        if existing_user_options:
+        if db.execute(insert_user_options_statement(user.uuid, user_options)).first() is None:
             raise HTTPException(status_code=400, detail="UserOptions already exist for this user.")
 
-        intake = calculate_user_intake(user_options)
-        new_user_options = UserOptions(
-            userUuid=user.uuid,
-            gender=user_options.gender,
-            height=user_options.height,
-            weight=user_options.weight,
-            weightGoal=user_options.weightGoal,
-            activityLevel=user_options.activityLevel,
-            age=user_options.age,
-            caloriesIntake=intake,
-        )
-
-        db.add(new_user_options)
+        # Options and the macros derived from them are committed together
+        saveOrUpdateUserMacros(db, user, calculate_user_macros(user, user_options))
         db.commit()
-        db.refresh(new_user_options)
-
-        user_macros = calculate_user_macros(user, user_options)
-
-        saveOrUpdateUserMacros(db, user, user_macros)
+        invalidate_recommendations(user.uuid)
 
         return {"message": "UserOptions saved successfully", "data": user_options.dict()}
 
@@ -59,32 +89,20 @@ def save_user_options(user_options: UserOptionsSchema, db: Session = Depends(get
         db.rollback()
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-@userOptionsRouter.post("/update-user-options", status_code=201)
+@userOptionsRouter.post("/update-user-options", status_code=201, response_model=DataResponse[UserOptionsSchema])
 def update_user_options(user_options: UserOptionsSchema, db: Session = Depends(get_db),
                       token: str = Depends(oauth2_scheme)):
     try:
-        print(token)
+        logger.debug("update-user-options token %s", redact(token))
 
         user = get_user_from_token(token, db)
 
-        existing_user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
-        if not existing_user_options:
+        if db.execute(update_user_options_statement(user.uuid, user_options)).rowcount == 0:
             raise HTTPException(status_code=400, detail="UserOptions not found for this user.")
 
-        existing_user_options.gender = user_options.gender
-        existing_user_options.height = user_options.height
-        existing_user_options.weight = user_options.weight
-        existing_user_options.weightGoal = user_options.weightGoal
-        existing_user_options.activityLevel = user_options.activityLevel
-        existing_user_options.age = user_options.age
-        existing_user_options.caloriesIntake = calculate_user_intake(user_options)
-
+        saveOrUpdateUserMacros(db, user, calculate_user_macros(user, user_options))
         db.commit()
-        db.refresh(existing_user_options)
-
-        user_macros = calculate_user_macros(user, user_options)
-
-        saveOrUpdateUserMacros(db, user, user_macros)
+        invalidate_recommendations(user.uuid)
 
         return {"message": "UserOptions updated successfully", "data": user_options.dict()}
 
@@ -95,8 +113,8 @@ def update_user_options(user_options: UserOptionsSchema, db: Session = Depends(g
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userOptionsRouter.get("/get-user-options", status_code=200)
-def get_user_options(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+@userOptionsRouter.get("/get-user-options", status_code=200, response_model=UserOptionsResponse)
+def get_user_options(db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
     try:
         user = get_user_from_token(token, db)
 
@@ -123,19 +141,5 @@ def get_user_options(db: Session = Depends(get_db), token: str = Depends(oauth2_
 
 
 def saveOrUpdateUserMacros(db, user, user_macros):
-    existing_user_macros = db.query(UserMacros).filter(UserMacros.userUuid == user.uuid).first()
-    if existing_user_macros:
-        existing_user_macros.calories = user_macros.calories
-        existing_user_macros.proteins = user_macros.proteins
-        existing_user_macros.fats = user_macros.fats
-        existing_user_macros.carbs = user_macros.carbs
-    else:
-        new_user_macros = UserMacros(
-            userUuid=user.uuid,
-            calories=user_macros.calories,
-            proteins=user_macros.proteins,
-            fats=user_macros.fats,
-            carbs=user_macros.carbs
-        )
-        db.add(new_user_macros)
-    db.commit()
+    # Part of the caller's transaction, the caller commits
+    db.execute(upsert_user_macros_statement([{**user_macros_row(user_macros), "userUuid": user.uuid}]))
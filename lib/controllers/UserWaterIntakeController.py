@@ -1,30 +1,53 @@
-import uuid
-from datetime import date
+import logging
+from datetime import date, datetime
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from lib.database.config import get_db
 from lib.database.models import UserOptions, WaterIntake
+from lib.utils.DailyRollupUtils import water_rollup_statement, rollup_delta_statement, delete_water_intake_statement
 from lib.utils.DateUtils import get_dates
-from lib.utils.UserMacrosUtils import calculate_water_intake
+from lib.utils.StreamImportUtils import ImportResponse, get_import_format, import_in_batches
+from lib.utils.RecommendationCacheUtils import get_cached_recommendations, cache_recommendations
+from lib.utils.ResponseUtils import RowModel, MessageResponse, DataResponse
+from lib.utils.LoggingUtils import redact
+from lib.utils.ReadRoutingUtils import get_read_db
 from lib.utils.UserUtils import get_user_from_token
 
 userWaterIntakesRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 
 class UserWaterSchema(BaseModel):
     ml: int
 
 
-@userWaterIntakesRouter.post("/add_water_intake")
+class WaterIntakeResponse(RowModel):
+    uuid: int
+    currentIntake: Optional[int]
+    date: Optional[date]
+    userUuid: Optional[str]
+
+
+class WaterRecommendationResponse(BaseModel):
+    ml: int
+
+
+WATER_INTAKE_COLUMNS = (WaterIntake.uuid, WaterIntake.currentIntake, WaterIntake.date, WaterIntake.userUuid)
+
+
+@userWaterIntakesRouter.post("/add_water_intake", response_model=DataResponse[WaterIntakeResponse])
 def add_water_intake(water_intake: UserWaterSchema, db: Session = Depends(get_db),
                      token: str = Depends(oauth2_scheme)):
     try:
-        print(token)
+        logger.debug("add_water_intake token %s", redact(token))
 
         # Get user from token
         user = get_user_from_token(token, db)
@@ -39,9 +62,56 @@ def add_water_intake(water_intake: UserWaterSchema, db: Session = Depends(get_db
                                  currentIntake=water_intake.ml,
                                  date=date.today())
         db.add(new_intake)
+        db.flush()
+        db.execute(water_rollup_statement(new_intake))
+        # Captured before the commit expires the instance, so serializing it doesn't reload the row
+        data = WaterIntakeResponse.model_validate(new_intake)
         db.commit()
 
-        return {"message": "Water intake saved successfully", "data": new_intake}
+        return {"message": "Water intake saved successfully", "data": data}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+def parse_water_intake_record(record: dict):
+    return {
+        "date": datetime.strptime(str(record["date"]).strip(), "%Y-%m-%d").date(),
+        "currentIntake": int(record["ml"]),
+    }
+
+
+def insert_water_intakes(db: Session, user_uuid: str, water_intakes: list[dict]):
+    db.execute(insert(WaterIntake).values([{"userUuid": user_uuid, **intake} for intake in water_intakes]))
+
+    daily_totals = {}
+    for intake in water_intakes:
+        daily_totals[intake["date"]] = daily_totals.get(intake["date"], 0) + intake["currentIntake"]
+    for day, total in daily_totals.items():
+        db.execute(rollup_delta_statement(user_uuid, day, waterMl=total))
+
+    db.commit()
+    return len(water_intakes)
+
+
+@userWaterIntakesRouter.post("/import_water_intakes", status_code=200, response_model=ImportResponse)
+async def import_water_intakes(request: Request, import_format: Optional[str] = Query(None, alias="format"),
+                               db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await run_in_threadpool(get_user_from_token, token, db)
+
+        result = await import_in_batches(
+            request,
+            get_import_format(request, import_format),
+            parse_water_intake_record,
+            lambda batch: insert_water_intakes(db, user.uuid, batch),
+        )
+
+        return {"message": "Water intakes imported", **result}
 
     except HTTPException as e:
         raise e
@@ -50,21 +120,20 @@ def add_water_intake(water_intake: UserWaterSchema, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userWaterIntakesRouter.delete("/delete_water_intake/{water_intake_id}")
-def delete_water_intake(water_intake_id: uuid.UUID, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+@userWaterIntakesRouter.delete("/delete_water_intake/{water_intake_id}", response_model=MessageResponse)
+def delete_water_intake(water_intake_id: int, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
-        # Fetch the water intake record by its ID and ensure it belongs to the user
-        water_intake = db.query(WaterIntake).filter(WaterIntake.uuid == water_intake_id,
-                                                    WaterIntake.userUuid == user.uuid).first()
+        # Delete the water intake record, only if it belongs to the user
+        water_intake = db.execute(delete_water_intake_statement(WaterIntake.uuid == water_intake_id,
+                                                                WaterIntake.userUuid == user.uuid)).first()
 
         if not water_intake:
             raise HTTPException(status_code=404, detail="Water intake record not found")
 
-        # Delete the water intake record
-        db.delete(water_intake)
+        db.execute(water_rollup_statement(water_intake, -1))
         db.commit()
 
         return {"message": "Water intake deleted successfully"}
@@ -76,10 +145,10 @@ def delete_water_intake(water_intake_id: uuid.UUID, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userWaterIntakesRouter.get("/water_intakes")
+@userWaterIntakesRouter.get("/water_intakes", response_model=list[WaterIntakeResponse])
 def get_water_intakes(
         day: str,
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
         token: str = Depends(oauth2_scheme)
 ):
     try:
@@ -89,7 +158,7 @@ def get_water_intakes(
         start_of_day, end_of_day = get_dates(day)
 
         # Query meals for the specific day
-        water_intakes = db.query(WaterIntake).filter(
+        water_intakes = db.query(*WATER_INTAKE_COLUMNS).filter(
             WaterIntake.userUuid == user.uuid,
             WaterIntake.date >= start_of_day,
             WaterIntake.date <= end_of_day
@@ -103,18 +172,23 @@ def get_water_intakes(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-@userWaterIntakesRouter.get("/recommended_water_intake", status_code=200)
-def recommended_water_intake(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+@userWaterIntakesRouter.get("/recommended_water_intake", status_code=200,
+                            response_model=DataResponse[WaterRecommendationResponse])
+def recommended_water_intake(db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
-        # Fetch user options to calculate recommended water intake
-        user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
-        if not user_options:
-            raise HTTPException(status_code=404, detail="User options not found")
+        # Served from memory until the user's options change
+        recommendations = get_cached_recommendations(user.uuid)
+        if recommendations is None:
+            user_options = db.query(UserOptions).filter(UserOptions.userUuid == user.uuid).first()
+            if not user_options:
+                raise HTTPException(status_code=404, detail="User options not found")
+
+            recommendations = cache_recommendations(user.uuid, user_options)
 
-        water_intake = calculate_water_intake(user_options)
+        water_intake = recommendations["waterMl"]
 
         # Return the recommended macros
         return {
@@ -1,18 +1,27 @@
+import logging
+import math
 from datetime import date, datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from lib.database.config import get_db
 from lib.database.models import UserWeight
 from lib.utils.DateUtils import get_dates, parse_dates
+from lib.utils.ResponseUtils import RowModel, DataResponse
+from lib.utils.StreamImportUtils import ImportResponse, get_import_format, import_in_batches
+from lib.utils.ReadRoutingUtils import get_read_db
 from lib.utils.UserUtils import get_user_from_token
+from lib.utils.WeightTrendUtils import calculate_weight_trend
 
 userWeightRouter = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 
 # Pydantic Model for adding weight
@@ -21,69 +30,166 @@ class UserWeightCreate(BaseModel):
     date: str
 
 
-class UserWeightResponse(BaseModel):
-    weight: float
+class UserWeightResponse(RowModel):
+    weight: Optional[float]
+    date: date
+
+
+class WeightTrendPoint(BaseModel):
     date: str
+    weight: float
+    movingAverage: float
+    ewma: float
+
 
-    class Config:
-        orm_mode = True
+class WeightTrendResponse(BaseModel):
+    points: list[WeightTrendPoint]
+    weeklyRate: Optional[float]
+    trendWeight: Optional[float]
+    projectedGoalDate: Optional[str]
 
 
-@userWeightRouter.post("/add_weight", status_code=201)
+@userWeightRouter.post("/add_weight", status_code=201, response_model=DataResponse[UserWeightCreate])
 def add_user_weight(weight: UserWeightCreate, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
-        new_weight = UserWeight(
-            userUuid=user.uuid,
-            weight=weight.weight,
-            date= datetime.strptime(weight.date, "%Y-%m-%d").date(),
-        )
-
-        db.add(new_weight)
+        # Re-posting a day replaces its weight instead of hitting the (userUuid, date) primary key
+        db.execute(upsert_user_weights_statement(user.uuid, [
+            {"date": datetime.strptime(weight.date, "%Y-%m-%d").date(), "weight": weight.weight}
+        ]))
         db.commit()
 
         return {"message": "Weight added successfully", "data": weight.dict()}
 
     except HTTPException as e:
-        print(e)
+        logger.info("add_weight rejected: %s", e.detail)
+        raise e
+    except Exception as e:
+        db.rollback()
+        logger.exception("add_weight failed")
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+def parse_weight_record(record: dict):
+    weight = float(record["weight"])
+    # float() accepts "nan" and "inf", which would be written as weights
+    if not math.isfinite(weight):
+        raise ValueError(f"Weight must be a finite number, got {record['weight']}")
+    return {
+        "date": datetime.strptime(str(record["date"]).strip(), "%Y-%m-%d").date(),
+        "weight": weight,
+    }
+
+
+def user_weight_rows(user_uuid: str, weights: list[dict]):
+    # ON CONFLICT can't touch the same row twice in one statement, so the last entry per date wins
+    return list({weight["date"]: {"userUuid": user_uuid, **weight} for weight in weights}.values())
+
+
+def upsert_user_weights_statement(user_uuid: str, weights: list[dict]):
+    statement = insert(UserWeight).values(user_weight_rows(user_uuid, weights))
+    return statement.on_conflict_do_update(
+        index_elements=[UserWeight.userUuid, UserWeight.date],
+        set_={"weight": statement.excluded.weight},
+    )
+
+
+def upsert_user_weights(db: Session, user_uuid: str, weights: list[dict]):
+    db.execute(upsert_user_weights_statement(user_uuid, weights))
+    db.commit()
+    # Rows written, repeated dates within the batch count once
+    return len(user_weight_rows(user_uuid, weights))
+
+
+@userWeightRouter.post("/import_weights", status_code=200, response_model=ImportResponse)
+async def import_user_weights(request: Request, import_format: Optional[str] = Query(None, alias="format"),
+                              db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
+    try:
+        # Get user from token
+        user = await run_in_threadpool(get_user_from_token, token, db)
+
+        result = await import_in_batches(
+            request,
+            get_import_format(request, import_format),
+            parse_weight_record,
+            lambda batch: upsert_user_weights(db, user.uuid, batch),
+        )
+
+        return {"message": "Weights imported", **result}
+
+    except HTTPException as e:
         raise e
     except Exception as e:
         db.rollback()
-        print(e)
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+def get_weight_filters(user_uuid: str, start_date: Optional[str], end_date: Optional[str]):
+    try:
+        start_of_day, end_of_day = parse_dates(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = [UserWeight.userUuid == user_uuid]
+    if start_of_day:
+        filters.append(UserWeight.date >= start_of_day)
+    if end_of_day:
+        filters.append(UserWeight.date <= end_of_day)
+
+    return filters
+
+
 @userWeightRouter.get("/weights", response_model=list[UserWeightResponse])
 def get_user_weights(
-        # start_date: Optional[str] = None,
-        # end_date: Optional[str] = None,
-        db: Session = Depends(get_db),
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        db: Session = Depends(get_read_db),
         token: str = Depends(oauth2_scheme)
 ):
     try:
         # Get user from token
         user = get_user_from_token(token, db)
 
-        # start_of_day, end_of_day = parse_dates(start_date, end_date)
+        return db.query(UserWeight.date, UserWeight.weight).filter(
+            *get_weight_filters(user.uuid, start_date, end_date)
+        ).order_by(UserWeight.date).all()
 
-        query = db.query(UserWeight).filter(UserWeight.userUuid == user.uuid)
-
-        # if start_of_day and end_of_day:
-        #     query = query.filter(start_of_day <= UserWeight.date <= end_of_day)
-        # elif start_of_day:
-        #     query = query.filter(UserWeight.date >= start_of_day)
-        # elif end_of_day:
-        #     query = query.filter(UserWeight.date <= end_of_day)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-        weights = query.all()
 
-        weights_response = [
-            {"date": weight.date.isoformat(), "weight": weight.weight} for weight in weights
-        ]
+@userWeightRouter.get("/weights/trend", status_code=200, response_model=WeightTrendResponse)
+def get_user_weight_trend(
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        window: int = Query(7, ge=1, le=365),
+        alpha: float = Query(0.1, gt=0, le=1),
+        rate_window_days: int = Query(28, ge=2, le=365),
+        goal_weight: Optional[float] = Query(None, gt=0),
+        db: Session = Depends(get_read_db),
+        token: str = Depends(oauth2_scheme)
+):
+    try:
+        # Get user from token
+        user = get_user_from_token(token, db)
 
-        return weights_response
+        weights = db.query(UserWeight.date, UserWeight.weight).filter(
+            *get_weight_filters(user.uuid, start_date, end_date),
+            UserWeight.weight.is_not(None),
+        ).order_by(UserWeight.date).all()
+
+        return calculate_weight_trend(
+            [weight.date for weight in weights],
+            [weight.weight for weight in weights],
+            window=window,
+            alpha=alpha,
+            rate_window_days=rate_window_days,
+            goal_weight=goal_weight,
+        )
 
     except HTTPException as e:
         raise e
@@ -1,4 +1,8 @@
-from sqlalchemy import create_engine, Table
+import threading
+import time
+
+from sqlalchemy import create_engine, event, Table, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
@@ -10,9 +14,80 @@ DATABASE_URL = (
     f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}?sslmode={os.getenv('DB_SSLMODE')}"
 )
 
-engine = create_engine(DATABASE_URL)
+# Optional streaming replica for GET routes; unset means every read goes to the primary
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+REPLICA_DATABASE_URL = (
+    f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+    f"@{DB_REPLICA_HOST}/{os.getenv('DB_NAME')}?sslmode={os.getenv('DB_SSLMODE')}"
+)
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+# Whole seconds; bounds how long an unreachable replica can hold up the lag probe or a replica read
+DB_REPLICA_CONNECT_TIMEOUT = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+
+# Serve the data routers from async handlers on an asyncpg engine instead of the sync threadpool path
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "false").lower() == "true"
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+    f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}?ssl={os.getenv('DB_SSLMODE')}"
+)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(DB_POOL_SIZE)))
+# Milliseconds, 0 disables the server-side statement timeout
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+    connect_args=connect_args,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine = None
+ReplicaSessionLocal = None
+if DB_REPLICA_HOST:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args={**connect_args, "connect_timeout": DB_REPLICA_CONNECT_TIMEOUT},
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC_MODE:
+    async_connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=async_connect_args,
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 Base = declarative_base()
 def get_db():
@@ -21,3 +96,120 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Seconds behind the primary; 0 when the replica has replayed everything it received,
+# since the last replay timestamp goes stale while the primary is idle
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+replica_state = {"usable": False, "lag": None, "checkedAt": None, "error": None}
+replica_state_lock = threading.Lock()
+# Held by the one request thread running the lag probe, the others keep the last known state meanwhile
+replica_probe_lock = threading.Lock()
+
+
+def check_replica():
+    try:
+        with replica_engine.connect() as connection:
+            lag = float(connection.execute(REPLICA_LAG_QUERY).scalar())
+        state = {"usable": lag <= DB_REPLICA_MAX_LAG_SECONDS, "lag": lag, "error": None}
+    except Exception as e:
+        state = {"usable": False, "lag": None, "error": str(e)}
+
+    with replica_state_lock:
+        replica_state.update(state, checkedAt=time.monotonic())
+    return state["usable"]
+
+
+def is_replica_usable():
+    if replica_engine is None:
+        return False
+
+    with replica_state_lock:
+        checked_at = replica_state["checkedAt"]
+        usable = replica_state["usable"]
+    if checked_at is not None and time.monotonic() - checked_at < DB_REPLICA_CHECK_INTERVAL:
+        return usable
+
+    if not replica_probe_lock.acquire(blocking=False):
+        return usable
+    try:
+        return check_replica()
+    finally:
+        replica_probe_lock.release()
+
+
+if replica_engine is not None:
+    @event.listens_for(replica_engine, "handle_error")
+    def mark_replica_down(context):
+        # Route reads back to the primary right away instead of waiting for the next lag check
+        if context.is_disconnect:
+            with replica_state_lock:
+                replica_state.update(usable=False, checkedAt=time.monotonic(), error=str(context.original_exception))
+
+
+def get_replica_or_primary_db(use_replica: bool):
+    db = ReplicaSessionLocal() if use_replica and is_replica_usable() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def warm_up_pool(size: int = DB_POOL_WARMUP):
+    # Open connections up front so the first requests after startup don't pay for the handshakes
+    connections = []
+    try:
+        for _ in range(min(size, DB_POOL_SIZE)):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def warm_up_async_pool(size: int = DB_POOL_WARMUP):
+    connections = []
+    try:
+        for _ in range(min(size, DB_POOL_SIZE)):
+            connection = await async_engine.connect()
+            await connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+def describe_pool(pool):
+    return {
+        "size": pool.size(),
+        "checkedIn": pool.checkedin(),
+        "checkedOut": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "maxOverflow": DB_MAX_OVERFLOW,
+        "timeout": pool.timeout(),
+    }
+
+
+def get_pool_stats():
+    stats = describe_pool(engine.pool)
+    if DB_ASYNC_MODE:
+        stats["async"] = describe_pool(async_engine.pool)
+    if replica_engine is not None:
+        with replica_state_lock:
+            stats["replica"] = {**describe_pool(replica_engine.pool), "usable": replica_state["usable"],
+                                "lagSeconds": replica_state["lag"], "error": replica_state["error"]}
+    return stats
@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+from datetime import date
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+from lib.database.config import engine
+from lib.database.models import (
+    Meal, WaterIntake, UserWeight, UserOptions, UserMacros, UserMeals, UserDailyRollup, Recipe
+)
+
+# Tables with fewer estimated rows than this may be scanned sequentially, the planner is right to do so
+DEFAULT_LARGE_TABLE_ROWS = 10000
+
+
+def hot_queries(user_uuid: str, email: str, day: date):
+    # Imported here so the check can be run without pulling the routers in at module import
+    from lib.controllers.DashboardController import dashboard_query
+    from lib.utils.FavouriteRecipesUtils import favourite_recipes_query
+    from lib.controllers.UserMealsController import get_meals_page_filters
+    from lib.controllers.UserWeightController import get_weight_filters
+    from lib.utils.UserUtils import user_lookup_query
+
+    return {
+        "auth: user by email": user_lookup_query(email, None),
+        "auth: user by uuid": user_lookup_query(email, user_uuid),
+        "GET /meals": select(Meal).where(*get_meals_page_filters(user_uuid, None, None, None))
+        .order_by(Meal.date.desc(), Meal.uuid.desc()).limit(100),
+        "GET /nutrition-summary": select(Meal.date, Meal.mealType, func.sum(Meal.calories))
+        .where(Meal.userUuid == user_uuid, Meal.date >= day, Meal.date <= day)
+        .group_by(Meal.date, Meal.mealType),
+        "GET /nutrition-summary/history": select(UserDailyRollup)
+        .where(UserDailyRollup.userUuid == user_uuid, UserDailyRollup.date >= day, UserDailyRollup.date <= day),
+        "GET /dashboard": dashboard_query(user_uuid, day),
+        "GET /water_intakes": select(WaterIntake)
+        .where(WaterIntake.userUuid == user_uuid, WaterIntake.date >= day, WaterIntake.date <= day),
+        "GET /weights": select(UserWeight.date, UserWeight.weight)
+        .where(*get_weight_filters(user_uuid, None, None)).order_by(UserWeight.date),
+        "GET /get-user-options": select(UserOptions).where(UserOptions.userUuid == user_uuid),
+        "GET /get-user-macros": select(UserMacros).where(UserMacros.userUuid == user_uuid),
+        "GET /recipes/{uuid}": select(Recipe).where(Recipe.uuid == "sample"),
+        "user meals": select(UserMeals).where(UserMeals.userUuid == user_uuid),
+        "GET /favourite_recipes": favourite_recipes_query(user_uuid, None, 100),
+    }
+
+
+def find_seq_scans(plan: dict):
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+
+def check_query_plans(large_table_rows: int = DEFAULT_LARGE_TABLE_ROWS):
+    failures = []
+    with engine.connect() as connection:
+        table_rows = dict(connection.execute(text(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"
+        )).all())
+        sample = connection.execute(text('SELECT "uuid", "email" FROM "User" LIMIT 1')).first()
+        user_uuid, email = sample if sample else ("sample", "sample@example.com")
+
+        for name, statement in hot_queries(user_uuid, email, date.today()).items():
+            sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            plan = plan if isinstance(plan, list) else json.loads(plan)
+
+            large_scans = [
+                table for table in find_seq_scans(plan[0]["Plan"])
+                if table_rows.get(table, 0) >= large_table_rows
+            ]
+            print(f"{'FAIL' if large_scans else 'ok':4}  {name}" + (f"  seq scan on {', '.join(large_scans)}" if large_scans else ""))
+            if large_scans:
+                failures.append((name, large_scans))
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN every router's hot queries and fail on seq scans of large tables.")
+    parser.add_argument("--large-table-rows", type=int, default=DEFAULT_LARGE_TABLE_ROWS)
+    args = parser.parse_args()
+
+    sys.exit(1 if check_query_plans(args.large_table_rows) else 0)
@@ -0,0 +1,172 @@
+import argparse
+from datetime import datetime
+
+from sqlalchemy import text
+
+from lib.database.config import engine
+from lib.database.models import UserDailyRollup
+
+MIGRATIONS_TABLE = "SchemaMigration"
+
+
+class IndexSpec:
+    def __init__(self, name: str, table: str, columns: list[str], unique: bool = False):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.unique = unique
+
+    def create_sql(self):
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        unique = "UNIQUE " if self.unique else ""
+        return f'CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS "{self.name}" ON "{self.table}" ({columns})'
+
+
+class Migration:
+    # Either a transactional list of steps (SQL strings or callables taking a connection),
+    # or indexes built CONCURRENTLY outside a transaction so writes aren't blocked on large tables.
+    # pre_steps run in their own transaction before the indexes, e.g. to clear duplicates a unique index rejects
+    def __init__(self, version: int, name: str, steps: list | None = None, indexes: list[IndexSpec] | None = None,
+                 post_steps: list | None = None, pre_steps: list | None = None):
+        self.version = version
+        self.name = name
+        self.pre_steps = pre_steps or []
+        self.steps = steps or []
+        self.indexes = indexes or []
+        self.post_steps = post_steps or []
+
+
+MIGRATIONS = [
+    Migration(1, "user_daily_rollup", steps=[
+        lambda connection: UserDailyRollup.__table__.create(connection, checkfirst=True),
+    ]),
+    Migration(2, "user_token_version", steps=[
+        'ALTER TABLE "User" ADD COLUMN IF NOT EXISTS "tokenVersion" INTEGER NOT NULL DEFAULT 0',
+    ]),
+    Migration(3, "hot_query_indexes", indexes=[
+        IndexSpec("ix_meal_user_date_uuid", "Meal", ["userUuid", "date", "uuid"]),
+        IndexSpec("ix_waterintake_user_date", "WaterIntake", ["userUuid", "date"]),
+        IndexSpec("ix_usermeals_user", "UserMeals", ["userUuid"]),
+        IndexSpec("ix_favouriterecipes_user", "FavouriteRecipes", ["userUuid"]),
+    ]),
+    Migration(4, "unique_user_email", indexes=[
+        IndexSpec("uq_user_email", "User", ["email"], unique=True),
+    ], post_steps=[
+        # Promote the concurrently built index to a constraint without another table scan
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_user_email') THEN
+                ALTER TABLE "User" ADD CONSTRAINT uq_user_email UNIQUE USING INDEX uq_user_email;
+            END IF;
+        END $$
+        """,
+    ]),
+    Migration(5, "unique_favourite_recipe", pre_steps=[
+        """
+        DELETE FROM "FavouriteRecipes" duplicate
+        USING "FavouriteRecipes" kept
+        WHERE duplicate."userUuid" = kept."userUuid"
+          AND duplicate."recipeUuid" = kept."recipeUuid"
+          AND duplicate."uuid" > kept."uuid"
+        """,
+    ], indexes=[
+        IndexSpec("uq_favouriterecipes_user_recipe", "FavouriteRecipes", ["userUuid", "recipeUuid"], unique=True),
+    ], post_steps=[
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_favouriterecipes_user_recipe') THEN
+                ALTER TABLE "FavouriteRecipes"
+                    ADD CONSTRAINT uq_favouriterecipes_user_recipe UNIQUE USING INDEX uq_favouriterecipes_user_recipe;
+            END IF;
+        END $$
+        """,
+    ]),
+]
+
+
+def run_step(connection, step):
+    if callable(step):
+        step(connection)
+    else:
+        connection.execute(text(step))
+
+
+def ensure_migrations_table():
+    with engine.begin() as connection:
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{MIGRATIONS_TABLE}" ('
+            '"version" INTEGER PRIMARY KEY, "name" VARCHAR NOT NULL, "appliedAt" TIMESTAMP NOT NULL)'
+        ))
+
+
+def get_applied_versions():
+    with engine.connect() as connection:
+        return set(connection.execute(text(f'SELECT "version" FROM "{MIGRATIONS_TABLE}"')).scalars())
+
+
+def record_migration(connection, migration: Migration):
+    connection.execute(
+        text(f'INSERT INTO "{MIGRATIONS_TABLE}" ("version", "name", "appliedAt") VALUES (:version, :name, :applied_at)'),
+        {"version": migration.version, "name": migration.name, "applied_at": datetime.utcnow()},
+    )
+
+
+def build_indexes_concurrently(indexes: list[IndexSpec]):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for index in indexes:
+            # A failed CONCURRENTLY build leaves an INVALID index behind that IF NOT EXISTS would keep
+            invalid = connection.execute(text(
+                "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": index.name}).first()
+            if invalid:
+                connection.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index.name}"'))
+
+            connection.execute(text(index.create_sql()))
+
+
+def apply_migration(migration: Migration):
+    if migration.pre_steps:
+        with engine.begin() as connection:
+            for step in migration.pre_steps:
+                run_step(connection, step)
+
+    if migration.indexes:
+        build_indexes_concurrently(migration.indexes)
+
+    with engine.begin() as connection:
+        for step in migration.steps + migration.post_steps:
+            run_step(connection, step)
+        record_migration(connection, migration)
+
+
+def upgrade():
+    ensure_migrations_table()
+    applied = get_applied_versions()
+
+    pending = [migration for migration in MIGRATIONS if migration.version not in applied]
+    for migration in sorted(pending, key=lambda migration: migration.version):
+        print(f"Applying migration {migration.version}: {migration.name}")
+        apply_migration(migration)
+
+    return len(pending)
+
+
+def status():
+    ensure_migrations_table()
+    applied = get_applied_versions()
+    return [(migration.version, migration.name, migration.version in applied) for migration in MIGRATIONS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or inspect versioned schema migrations.")
+    parser.add_argument("command", choices=["upgrade", "status"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        print(f"Applied {upgrade()} migrations")
+    else:
+        for version, name, is_applied in status():
+            print(f"{version:>4}  {'applied' if is_applied else 'pending':8}  {name}")
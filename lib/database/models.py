@@ -1,6 +1,6 @@
 import enum
 from sqlalchemy import (
-    Column, String, Float, Date, Enum, ForeignKey, Boolean, BigInteger, Integer
+    Column, String, Float, Date, Enum, ForeignKey, Boolean, BigInteger, Integer, Index, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from lib.database.config import Base
@@ -26,11 +26,16 @@ class ActivityLevel(enum.Enum):
 
 class User(Base):
     __tablename__ = 'User'
+    __table_args__ = (
+        UniqueConstraint('email', name='uq_user_email'),
+    )
 
     uuid = Column(String, primary_key=True)
     email = Column(String, nullable=False)
     password = Column(String, nullable=False)
     registeredAt = Column(Date, nullable=False)
+    # Bumped to revoke every access token issued before
+    tokenVersion = Column(Integer, nullable=False, default=0, server_default="0")
 
     user_options = relationship("UserOptions", back_populates="user", uselist=False)
     user_macros = relationship("UserMacros", back_populates="user", uselist=False)
@@ -42,6 +47,9 @@ class User(Base):
 
 class UserMeals(Base):
     __tablename__ = 'UserMeals'
+    __table_args__ = (
+        Index('ix_usermeals_user', 'userUuid'),
+    )
 
     uuid = Column(String, primary_key=True)
     userUuid = Column(String, ForeignKey('User.uuid'))
@@ -88,6 +96,9 @@ class UserWeight(Base):
 
 class WaterIntake(Base):
     __tablename__ = 'WaterIntake'
+    __table_args__ = (
+        Index('ix_waterintake_user_date', 'userUuid', 'date'),
+    )
 
     uuid = Column(BigInteger, primary_key=True, autoincrement=True)
     currentIntake = Column(Integer)
@@ -96,6 +107,18 @@ class WaterIntake(Base):
     userUuid = Column(String, ForeignKey('User.uuid'))
     user = relationship("User", back_populates="water_intake")
 
+class UserDailyRollup(Base):
+    __tablename__ = 'UserDailyRollup'
+
+    userUuid = Column(String, ForeignKey('User.uuid'), primary_key=True)
+    date = Column(Date, primary_key=True)
+    calories = Column(BigInteger, nullable=False, default=0)
+    proteins = Column(BigInteger, nullable=False, default=0)
+    fats = Column(BigInteger, nullable=False, default=0)
+    carbs = Column(BigInteger, nullable=False, default=0)
+    waterMl = Column(BigInteger, nullable=False, default=0)
+    mealCount = Column(Integer, nullable=False, default=0)
+
 class Recipe(Base):
     __tablename__ = 'Recipe'
 
@@ -121,6 +144,10 @@ class MealType(enum.Enum):
 
 class Meal(Base):
     __tablename__ = 'Meal'
+    __table_args__ = (
+        # Serves the keyset-paginated /meals listing as a single index range scan
+        Index('ix_meal_user_date_uuid', 'userUuid', 'date', 'uuid'),
+    )
 
     uuid = Column(String, primary_key=True)
     title = Column(String)
@@ -137,6 +164,10 @@ class Meal(Base):
 
 class FavouriteRecipes(Base):
     __tablename__ = 'FavouriteRecipes'
+    __table_args__ = (
+        Index('ix_favouriterecipes_user', 'userUuid'),
+        UniqueConstraint('userUuid', 'recipeUuid', name='uq_favouriterecipes_user_recipe'),
+    )
 
     uuid = Column(String, primary_key=True)
     userUuid = Column(String, ForeignKey('User.uuid'))
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[1] <= now:
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            # Most recently used entries live at the end of the dict
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl_seconds: float | None = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if self.max_size <= 0 or ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+        return None if entry is _MISSING else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
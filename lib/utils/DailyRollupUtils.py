@@ -0,0 +1,109 @@
+import argparse
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from lib.database.models import Meal, UserDailyRollup, WaterIntake
+
+ROLLUP_FIELDS = ("calories", "proteins", "fats", "carbs", "waterMl", "mealCount")
+
+
+def rollup_delta_statement(user_uuid: str, day, **deltas):
+    values = {field: deltas.get(field) or 0 for field in ROLLUP_FIELDS}
+    statement = insert(UserDailyRollup).values(userUuid=user_uuid, date=day, **values)
+
+    # Add the deltas to an existing row instead of overwriting it
+    table = UserDailyRollup.__table__
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.userUuid, table.c.date],
+        set_={field: table.c[field] + statement.excluded[field] for field in ROLLUP_FIELDS},
+    )
+
+
+def meal_rollup_statement(meal: Meal, sign: int = 1):
+    return rollup_delta_statement(
+        meal.userUuid,
+        meal.date,
+        calories=sign * (meal.calories or 0),
+        proteins=sign * (meal.proteins or 0),
+        fats=sign * (meal.fats or 0),
+        carbs=sign * (meal.carbs or 0),
+        mealCount=sign,
+    )
+
+
+def water_rollup_statement(water_intake: WaterIntake, sign: int = 1):
+    return rollup_delta_statement(
+        water_intake.userUuid,
+        water_intake.date,
+        waterMl=sign * (water_intake.currentIntake or 0),
+    )
+
+
+def delete_meal_statement(*filters):
+    # The deleted row comes back only to the transaction that removed it, so concurrent deletes subtract it once
+    return delete(Meal).where(*filters).returning(
+        Meal.userUuid, Meal.date, Meal.calories, Meal.proteins, Meal.fats, Meal.carbs
+    )
+
+
+def delete_water_intake_statement(*filters):
+    return delete(WaterIntake).where(*filters).returning(
+        WaterIntake.userUuid, WaterIntake.date, WaterIntake.currentIntake
+    )
+
+
+def rebuild_daily_rollups(db: Session, user_uuid: str | None = None):
+    meals = select(
+        Meal.userUuid.label("userUuid"),
+        Meal.date.label("date"),
+        func.coalesce(Meal.calories, 0).label("calories"),
+        func.coalesce(Meal.proteins, 0).label("proteins"),
+        func.coalesce(Meal.fats, 0).label("fats"),
+        func.coalesce(Meal.carbs, 0).label("carbs"),
+        literal(0).label("waterMl"),
+        literal(1).label("mealCount"),
+    ).where(Meal.userUuid.is_not(None), Meal.date.is_not(None))
+    water_intakes = select(
+        WaterIntake.userUuid,
+        WaterIntake.date,
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(0),
+        func.coalesce(WaterIntake.currentIntake, 0),
+        literal(0),
+    ).where(WaterIntake.userUuid.is_not(None), WaterIntake.date.is_not(None))
+
+    clear_rollups = delete(UserDailyRollup)
+    if user_uuid:
+        meals = meals.where(Meal.userUuid == user_uuid)
+        water_intakes = water_intakes.where(WaterIntake.userUuid == user_uuid)
+        clear_rollups = clear_rollups.where(UserDailyRollup.userUuid == user_uuid)
+
+    rows = union_all(meals, water_intakes).subquery()
+    totals = select(
+        rows.c.userUuid,
+        rows.c.date,
+        *[func.sum(rows.c[field]) for field in ROLLUP_FIELDS],
+    ).group_by(rows.c.userUuid, rows.c.date)
+
+    # Delete and re-insert in one transaction so readers never see a partially rebuilt table
+    db.execute(clear_rollups)
+    result = db.execute(
+        insert(UserDailyRollup).from_select(["userUuid", "date", *ROLLUP_FIELDS], totals)
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from lib.database.config import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild UserDailyRollup from the Meal and WaterIntake tables.")
+    parser.add_argument("--user", help="Only rebuild the rollups of this user uuid")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(f"Rebuilt {rebuild_daily_rollups(db, args.user)} daily rollup rows")
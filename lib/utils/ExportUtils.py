@@ -0,0 +1,121 @@
+import argparse
+import csv
+import enum
+import io
+import os
+import sys
+import zlib
+from datetime import date
+from typing import Optional
+
+import orjson
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+
+from lib.database.models import Meal, WaterIntake, UserWeight
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# userUuid leads every export so the same rows work for a single user and for the data team's full dumps
+EXPORT_TABLES = {
+    "meals": (
+        Meal.userUuid, Meal.date, Meal.uuid, Meal.mealType, Meal.title, Meal.weight, Meal.calories, Meal.proteins,
+        Meal.fats, Meal.carbs,
+    ),
+    "water_intakes": (WaterIntake.userUuid, WaterIntake.date, WaterIntake.uuid, WaterIntake.currentIntake),
+    "weights": (UserWeight.userUuid, UserWeight.date, UserWeight.weight),
+}
+
+
+def get_export_format(request: Request, export_format: Optional[str]):
+    if export_format is None:
+        export_format = "csv" if "csv" in request.headers.get("accept", "") else "ndjson"
+
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}. Use 'ndjson' or 'csv'.")
+
+    return export_format
+
+
+def accepts_gzip(request: Request):
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def export_query(table: str, user_uuid: str | None = None, start_date: date | None = None,
+                 end_date: date | None = None):
+    columns = EXPORT_TABLES[table]
+    model = columns[0].class_
+
+    filters = []
+    if user_uuid is not None:
+        filters.append(model.userUuid == user_uuid)
+    if start_date:
+        filters.append(model.date >= start_date)
+    if end_date:
+        filters.append(model.date <= end_date)
+
+    # A server-side cursor hands rows over EXPORT_BATCH_SIZE at a time instead of buffering the result
+    return select(*columns).where(*filters).order_by(*columns[:2]).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def export_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(rows, header: list[str] | None = None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows, fields: list[str]):
+    return b"".join(orjson.dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+
+
+def iter_export_chunks(session_factory, table: str, export_format: str, gzip: bool = False, **filters):
+    # Runs for the whole response, so it owns its session rather than borrowing the request's
+    fields = [column.key for column in EXPORT_TABLES[table]]
+    # wbits=31 writes a gzip container, each chunk is flushed so the client gets bytes as rows arrive
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+
+    def emit(data: bytes):
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else data
+
+    with session_factory() as db:
+        if export_format == "csv":
+            yield emit(encode_csv([], fields))
+
+        for rows in db.execute(export_query(table, **filters)).partitions():
+            yield emit(encode_csv(rows) if export_format == "csv" else encode_ndjson(rows, fields))
+
+    if compressor:
+        yield compressor.flush()
+
+
+if __name__ == "__main__":
+    from lib.database.config import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Stream a full history table to stdout or a file.")
+    parser.add_argument("table", choices=list(EXPORT_TABLES))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--user", help="Only export this user's rows")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="Defaults to stdout")
+    args = parser.parse_args()
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export_chunks(SessionLocal, args.table, args.format, args.gzip, user_uuid=args.user):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
@@ -0,0 +1,63 @@
+import hashlib
+
+import orjson
+from fastapi import Response
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from lib.database.models import FavouriteRecipes, Recipe
+from lib.utils.RecipeCatalogueUtils import RECIPE_LIST_COLUMNS, RecipeCatalogue, etag_matches
+
+
+def favourite_uuids_query(user_uuid: str):
+    # Covered by the (userUuid, recipeUuid) unique index, no need to touch Recipe
+    return select(FavouriteRecipes.recipeUuid).where(FavouriteRecipes.userUuid == user_uuid)
+
+
+def favourite_recipes_query(user_uuid: str, after_recipe_uuid: str | None, limit: int):
+    # Recipe columns come back in the same statement, instead of lazy loading each favourite's recipe
+    filters = [FavouriteRecipes.userUuid == user_uuid]
+    if after_recipe_uuid:
+        filters.append(FavouriteRecipes.recipeUuid > after_recipe_uuid)
+
+    return select(*RECIPE_LIST_COLUMNS).join(
+        FavouriteRecipes, FavouriteRecipes.recipeUuid == Recipe.uuid
+    ).where(*filters).order_by(FavouriteRecipes.recipeUuid).limit(limit)
+
+
+def add_favourite_statement(favourite_uuid: str, user_uuid: str, recipe_uuid: str):
+    # Favouriting twice is a no-op rather than a duplicate row
+    return insert(FavouriteRecipes).values(
+        uuid=favourite_uuid, userUuid=user_uuid, recipeUuid=recipe_uuid
+    ).on_conflict_do_nothing(constraint="uq_favouriterecipes_user_recipe")
+
+
+def remove_favourite_statement(user_uuid: str, recipe_uuid: str):
+    return delete(FavouriteRecipes).where(
+        FavouriteRecipes.userUuid == user_uuid, FavouriteRecipes.recipeUuid == recipe_uuid
+    )
+
+
+def favourites_etag(catalogue: RecipeCatalogue, favourites: set[str]):
+    # Changes whenever either the catalogue or the user's favourites do
+    digest = hashlib.sha1("|".join(sorted(favourites)).encode()).hexdigest()[:12]
+    return f'{catalogue.etag[:-1]}-{digest}"'
+
+
+def encode_recipe_list(catalogue: RecipeCatalogue, favourites: set[str]):
+    return orjson.dumps(
+        [{**item, "isFavourite": item["uuid"] in favourites} for item in catalogue.items],
+        option=orjson.OPT_SORT_KEYS,
+    )
+
+
+def recipe_list_response(catalogue: RecipeCatalogue, favourites: set[str], if_none_match: str | None):
+    # Without favourites everyone shares the pre-encoded catalogue and its ETag
+    etag = favourites_etag(catalogue, favourites) if favourites else catalogue.etag
+    # The isFavourite flags depend on the caller, shared caches must not hand one user's list to another
+    headers = {"ETag": etag, "Vary": "Authorization"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = encode_recipe_list(catalogue, favourites) if favourites else catalogue.body
+    return Response(content=body, media_type="application/json", headers={**headers, "Cache-Control": "no-cache"})
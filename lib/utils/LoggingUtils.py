@@ -0,0 +1,94 @@
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Comma separated per-module overrides, e.g. "lib.controllers=DEBUG,sqlalchemy.engine=WARNING"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of DEBUG records kept once a module is switched to DEBUG, they are logged on every request
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+log_listener = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    # Never blocks the caller: when the writer thread falls behind, records are dropped and counted
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # QueueHandler.prepare() runs the full format here, on the caller's thread. Only the args are merged, so a
+        # mutable argument can't change before it is written, the traceback and layout are left to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class DebugSamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+def parse_log_levels(levels: str):
+    overrides = {}
+    for item in levels.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            overrides[name.strip()] = level.strip().upper()
+    return overrides
+
+
+def configure_logging():
+    global log_listener
+    if log_listener is not None:
+        return log_listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(DebugSamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+    for name, level in parse_log_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    # Formatting (see DroppingQueueHandler.prepare) and stdout writes happen on the listener's thread, not the request's
+    log_listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(stop_logging)
+    return log_listener
+
+
+def stop_logging():
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+
+def redact(secret: str | None):
+    if not secret:
+        return secret
+    return f"{secret[:6]}...({len(secret)} chars)"
@@ -0,0 +1,259 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from lib.utils.PasswordUtils import get_password_hash_stats
+from lib.utils.RecommendationCacheUtils import get_recommendation_cache_stats
+
+logger = logging.getLogger(__name__)
+
+METRICS_QUERY_WARNING_THRESHOLD = int(os.getenv("METRICS_QUERY_WARNING_THRESHOLD", "20"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.phases = {}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def render(self, name: str, labels: str):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses = {}
+        self.db_time = 0.0
+        self.rows = 0
+        self.phases = {}
+
+
+# Set per request by the middleware; the object is mutated in place so sync handlers
+# running in the threadpool (which get a copy of the context) still report into it
+current_request_metrics: ContextVar[RequestMetrics | None] = ContextVar("current_request_metrics", default=None)
+
+route_metrics = {}
+route_metrics_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+    metrics = current_request_metrics.get()
+    if metrics is None:
+        return
+
+    metrics.queries += 1
+    metrics.db_time += elapsed
+    if cursor.description is not None:
+        metrics.rows += max(cursor.rowcount, 0)
+
+
+@event.listens_for(Engine, "handle_error")
+def handle_cursor_error(context):
+    # after_cursor_execute doesn't fire for a failed statement, drop its start time so the
+    # pooled connection's next query isn't paired with it
+    if context.connection is None or context.execution_context is None:
+        return
+    start_times = context.connection.info.get("query_start_times")
+    if start_times:
+        start_times.pop()
+
+
+@contextmanager
+def time_phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.phases[name] = metrics.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def record_request(method: str, route: str, status: int, elapsed: float, metrics: RequestMetrics):
+    if metrics.queries > METRICS_QUERY_WARNING_THRESHOLD:
+        logger.warning(
+            "%s %s ran %d SQL statements in one request (threshold %d), possible N+1 query",
+            method, route, metrics.queries, METRICS_QUERY_WARNING_THRESHOLD,
+        )
+
+    with route_metrics_lock:
+        stats = route_metrics.setdefault((method, route), RouteMetrics())
+        stats.latency.observe(elapsed)
+        stats.queries.observe(metrics.queries)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.db_time += metrics.db_time
+        stats.rows += metrics.rows
+        for phase, seconds in metrics.phases.items():
+            stats.phases[phase] = stats.phases.get(phase, 0.0) + seconds
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request_metrics.reset(token)
+            # The router stores the matched route on the scope; label by its template, not the raw path
+            route = scope.get("route")
+            record_request(scope["method"], route.path if route else "unmatched", status,
+                           time.perf_counter() - started, metrics)
+
+
+def escape_label(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_metrics():
+    lines = [
+        "# HELP http_request_duration_seconds Request latency by route",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with route_metrics_lock:
+        snapshot = sorted(route_metrics.items())
+
+        for (method, route), stats in snapshot:
+            lines.extend(stats.latency.render("http_request_duration_seconds",
+                                              f'method="{method}",route="{escape_label(route)}"'))
+
+        lines += ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+        for (method, route), stats in snapshot:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{escape_label(route)}",'
+                             f'status="{status}"}} {count}')
+
+        lines += ["# HELP http_request_db_queries SQL statements per request",
+                  "# TYPE http_request_db_queries histogram"]
+        for (method, route), stats in snapshot:
+            lines.extend(stats.queries.render("http_request_db_queries",
+                                              f'method="{method}",route="{escape_label(route)}"'))
+
+        lines += ["# HELP http_request_db_seconds_total Time spent executing SQL",
+                  "# TYPE http_request_db_seconds_total counter"]
+        for (method, route), stats in snapshot:
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{escape_label(route)}"}} '
+                         f'{stats.db_time}')
+
+        lines += ["# HELP http_request_db_rows_total Rows returned by SQL statements",
+                  "# TYPE http_request_db_rows_total counter"]
+        for (method, route), stats in snapshot:
+            lines.append(f'http_request_db_rows_total{{method="{method}",route="{escape_label(route)}"}} '
+                         f'{stats.rows}')
+
+        lines += ["# HELP http_request_phase_seconds_total Time spent in instrumented phases such as JWT decoding",
+                  "# TYPE http_request_phase_seconds_total counter"]
+        for (method, route), stats in snapshot:
+            for phase, seconds in sorted(stats.phases.items()):
+                lines.append(f'http_request_phase_seconds_total{{method="{method}",route="{escape_label(route)}",'
+                             f'phase="{phase}"}} {seconds}')
+
+    lines.extend(render_password_hash_metrics())
+    lines.extend(render_cache_metrics())
+    return "\n".join(lines) + "\n"
+
+
+def render_password_hash_metrics():
+    stats = get_password_hash_stats()
+    metrics = (
+        ("password_hash_completed_total", "counter", "Password hashes and verifications completed", "completed"),
+        ("password_hash_rejected_total", "counter", "Password hashes rejected because the queue was full",
+         "rejected"),
+        ("password_hash_in_flight", "gauge", "Password hashes running or waiting for a worker", "inFlight"),
+        ("password_hash_seconds_total", "counter", "Time spent hashing passwords", "hashSecondsTotal"),
+        ("password_hash_seconds_max", "gauge", "Slowest password hash", "hashSecondsMax"),
+        ("password_hash_queue_wait_seconds_total", "counter", "Time password hashes waited for a worker",
+         "queueWaitSecondsTotal"),
+        ("password_hash_queue_wait_seconds_max", "gauge", "Longest wait for a password hash worker",
+         "queueWaitSecondsMax"),
+    )
+
+    lines = []
+    for name, metric_type, description, key in metrics:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}", f"{name} {stats[key]}"]
+    return lines
+
+
+def render_cache_metrics():
+    # Imported here, UserUtils imports time_phase from this module
+    from lib.utils.UserUtils import get_user_cache_stats
+
+    user_cache_stats = get_user_cache_stats()
+    recommendation_cache_stats = get_recommendation_cache_stats()
+    caches = {
+        "user_identities": user_cache_stats["users"],
+        "token_claims": user_cache_stats["tokens"],
+        "recommendation_fingerprints": recommendation_cache_stats["users"],
+        "recommendations": recommendation_cache_stats["recommendations"],
+    }
+    metrics = (
+        ("cache_hits_total", "counter", "In-process cache hits", "hits"),
+        ("cache_misses_total", "counter", "In-process cache misses", "misses"),
+        ("cache_entries", "gauge", "Entries held by an in-process cache", "size"),
+        ("cache_max_entries", "gauge", "Entry limit of an in-process cache", "maxSize"),
+    )
+
+    lines = []
+    for name, metric_type, description, key in metrics:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+        lines.extend(f'{name}{{cache="{cache}"}} {stats[key]}' for cache, stats in caches.items())
+    return lines
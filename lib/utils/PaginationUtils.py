@@ -0,0 +1,32 @@
+import base64
+from datetime import date
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+def encode_cursor(*values):
+    # The sort key of the last row returned, e.g. (date, uuid) for meals or (uuid,) for favourite recipes
+    raw = "|".join(value.isoformat() if isinstance(value, date) else str(value) for value in values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor_values(cursor: str, count: int):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = base64.urlsafe_b64decode(padded).decode().split("|", count - 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    if len(values) != count:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return values
+
+
+def decode_cursor(cursor: str):
+    raw_date, last_uuid = decode_cursor_values(cursor, 2)
+    try:
+        return date.fromisoformat(raw_date), last_uuid
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
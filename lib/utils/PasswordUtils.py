@@ -0,0 +1,89 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# bcrypt cost factor; hashes made with another cost are transparently upgraded on the next login
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Hash requests allowed to wait for a worker before new ones are rejected with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+password_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=PASSWORD_HASH_ROUNDS)
+
+# A dedicated pool keeps hashing from occupying every request thread during login storms;
+# the bcrypt backend releases the GIL while it works
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "inFlight": 0,
+    "hashSecondsTotal": 0.0,
+    "hashSecondsMax": 0.0,
+    "queueWaitSecondsTotal": 0.0,
+    "queueWaitSecondsMax": 0.0,
+}
+
+
+def _record(queue_wait: float, hash_seconds: float):
+    with _stats_lock:
+        _stats["completed"] += 1
+        _stats["hashSecondsTotal"] += hash_seconds
+        _stats["hashSecondsMax"] = max(_stats["hashSecondsMax"], hash_seconds)
+        _stats["queueWaitSecondsTotal"] += queue_wait
+        _stats["queueWaitSecondsMax"] = max(_stats["queueWaitSecondsMax"], queue_wait)
+
+
+def _submit_to_hash_pool(function, *args):
+    if not _slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Too many authentication requests, try again shortly.",
+                            headers={"Retry-After": "1"})
+
+    submitted_at = time.perf_counter()
+
+    def task():
+        started_at = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            _record(started_at - submitted_at, time.perf_counter() - started_at)
+
+    def release(_):
+        with _stats_lock:
+            _stats["inFlight"] -= 1
+        _slots.release()
+
+    with _stats_lock:
+        _stats["inFlight"] += 1
+    future = _executor.submit(task)
+    # Runs once the hash finishes or is cancelled, so an abandoned request still frees its slot
+    future.add_done_callback(release)
+    return future
+
+
+async def _run_in_hash_pool(function, *args):
+    # Awaited on the event loop, so waiting for a hash doesn't hold one of the request threads
+    return await asyncio.wrap_future(_submit_to_hash_pool(function, *args))
+
+
+async def hash_password(password: str):
+    return await _run_in_hash_pool(password_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str):
+    # Returns (is_valid, new_hash); new_hash is set when the stored hash uses an outdated cost factor
+    return await _run_in_hash_pool(password_context.verify_and_update, password, hashed_password)
+
+
+def get_password_hash_stats():
+    with _stats_lock:
+        return dict(_stats)
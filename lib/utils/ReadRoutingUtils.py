@@ -0,0 +1,62 @@
+import os
+
+from fastapi import HTTPException, Request
+
+from lib.database.config import replica_engine, get_replica_or_primary_db
+from lib.utils.CacheUtils import TTLCache
+from lib.utils.UserUtils import decode_token_claims
+
+# After a user writes, their reads stay on the primary for this long so they see their own changes
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+RECENT_WRITERS_MAX_SIZE = int(os.getenv("RECENT_WRITERS_MAX_SIZE", "100000"))
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+recent_writers = TTLCache(max_size=RECENT_WRITERS_MAX_SIZE, ttl_seconds=DB_REPLICA_STICKY_SECONDS)
+
+
+def bearer_token(authorization: str | None):
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return None
+
+
+def writer_key(token: str | None):
+    if not token:
+        return None
+    try:
+        email, user_uuid, _ = decode_token_claims(token)
+    except HTTPException:
+        return None
+    return user_uuid or email
+
+
+def mark_recent_write(key: str | None):
+    if key and replica_engine is not None:
+        recent_writers.set(key, True)
+
+
+def get_read_db(request: Request):
+    # Read-only routes use this instead of get_db; falls back to the primary when there is no replica,
+    # it is lagging or down, or the caller has just written
+    use_replica = replica_engine is not None and not recent_writers.get(
+        writer_key(bearer_token(request.headers.get("authorization"))), False
+    )
+    yield from get_replica_or_primary_db(use_replica)
+
+
+class ReadAfterWriteMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or replica_engine is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_mark(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                authorization = dict(scope["headers"]).get(b"authorization")
+                mark_recent_write(writer_key(bearer_token(authorization.decode("latin-1") if authorization else None)))
+            await send(message)
+
+        await self.app(scope, receive, send_and_mark)
@@ -0,0 +1,111 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+import numpy as np
+import orjson
+from sqlalchemy import select
+
+from lib.database.models import Recipe
+
+RECIPE_CACHE_TTL_SECONDS = float(os.getenv("RECIPE_CACHE_TTL_SECONDS", "300"))
+# Shared secret for POST /recipes/cache/invalidate; unset disables the endpoint and only the TTL applies
+RECIPE_CACHE_ADMIN_TOKEN = os.getenv("RECIPE_CACHE_ADMIN_TOKEN")
+RECIPE_MACRO_FIELDS = ("calories", "proteins", "fats", "carbs")
+
+# Everything but the long description, which is only served by the per-recipe endpoint
+RECIPE_LIST_COLUMNS = (
+    Recipe.uuid,
+    Recipe.title,
+    Recipe.calories,
+    Recipe.proteins,
+    Recipe.fats,
+    Recipe.carbs,
+    Recipe.mealType,
+    Recipe.cookingTime,
+    Recipe.coverImage,
+    Recipe.isPopular,
+)
+
+recipe_list_query = select(*RECIPE_LIST_COLUMNS).order_by(Recipe.uuid)
+
+
+class RecipeCatalogue:
+    def __init__(self, items: list[dict], version: int):
+        self.items = items
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # Encoded once per load and served as-is until the catalogue changes, to anyone without favourites
+        self.body = orjson.dumps([{**item, "isFavourite": False} for item in items], option=orjson.OPT_SORT_KEYS)
+        # Derived from the content so every worker hands out the same ETag for the same catalogue
+        self.etag = f'"recipes-{hashlib.sha1(self.body).hexdigest()[:20]}"'
+        # One row per recipe, columns in RECIPE_MACRO_FIELDS order, for ranking the whole catalogue at once
+        self.macro_matrix = np.array(
+            [[item[field] or 0 for field in RECIPE_MACRO_FIELDS] for item in items], dtype=float
+        ).reshape(len(items), len(RECIPE_MACRO_FIELDS))
+        self.meal_types = np.array([(item["mealType"] or "").lower() for item in items], dtype=object)
+
+    def is_fresh(self):
+        return time.monotonic() - self.loaded_at < RECIPE_CACHE_TTL_SECONDS
+
+
+_catalogue: RecipeCatalogue | None = None
+_catalogue_version = 0
+_lock = threading.Lock()
+
+
+def _store_catalogue(rows, version: int):
+    global _catalogue
+    catalogue = RecipeCatalogue([dict(row._mapping) for row in rows], version)
+    with _lock:
+        # Don't resurrect a catalogue that was invalidated while it was being loaded
+        if version == _catalogue_version:
+            _catalogue = catalogue
+    return catalogue
+
+
+def _cached_catalogue():
+    with _lock:
+        if _catalogue is not None and _catalogue.is_fresh():
+            return _catalogue, _catalogue_version
+        return None, _catalogue_version
+
+
+def get_recipe_catalogue(db):
+    catalogue, version = _cached_catalogue()
+    if catalogue is not None:
+        return catalogue
+
+    return _store_catalogue(db.execute(recipe_list_query).all(), version)
+
+
+async def get_recipe_catalogue_async(db):
+    catalogue, version = _cached_catalogue()
+    if catalogue is not None:
+        return catalogue
+
+    result = await db.execute(recipe_list_query)
+    return _store_catalogue(result.all(), version)
+
+
+def invalidate_recipe_catalogue():
+    # Call after any write to the Recipe table. Recipes are written outside the API (benchmarks.seed, imports),
+    # which reach a running server through POST /recipes/cache/invalidate
+    global _catalogue, _catalogue_version
+    with _lock:
+        _catalogue = None
+        _catalogue_version += 1
+
+
+def is_recipe_cache_admin(token: str | None):
+    return bool(RECIPE_CACHE_ADMIN_TOKEN and token) and hmac.compare_digest(token, RECIPE_CACHE_ADMIN_TOKEN)
+
+
+def etag_matches(if_none_match: str | None, etag: str):
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
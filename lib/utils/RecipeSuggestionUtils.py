@@ -0,0 +1,62 @@
+from datetime import date
+
+import numpy as np
+from sqlalchemy import and_, select
+
+from lib.database.models import UserMacros, UserDailyRollup
+from lib.utils.RecipeCatalogueUtils import RecipeCatalogue, RECIPE_MACRO_FIELDS
+
+DEFAULT_SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 50
+
+
+def remaining_macros_query(user_uuid: str, day: date):
+    # The day's meal totals come from the rollup, so this stays a single primary key lookup
+    return select(
+        *[getattr(UserMacros, field).label(f"target_{field}") for field in RECIPE_MACRO_FIELDS],
+        *[getattr(UserDailyRollup, field).label(f"consumed_{field}") for field in RECIPE_MACRO_FIELDS],
+    ).select_from(UserMacros).outerjoin(
+        UserDailyRollup, and_(UserDailyRollup.userUuid == UserMacros.userUuid, UserDailyRollup.date == day)
+    ).where(UserMacros.userUuid == user_uuid)
+
+
+def remaining_macros(row):
+    target = np.array([getattr(row, f"target_{field}") or 0 for field in RECIPE_MACRO_FIELDS], dtype=float)
+    consumed = np.array([getattr(row, f"consumed_{field}") or 0 for field in RECIPE_MACRO_FIELDS], dtype=float)
+    return target, np.clip(target - consumed, 0, None)
+
+
+def rank_recipes(catalogue: RecipeCatalogue, target: np.ndarray, remaining: np.ndarray, meal_type: str | None,
+                 limit: int, favourites: set[str]):
+    candidates = np.arange(len(catalogue.items))
+    if meal_type:
+        candidates = candidates[catalogue.meal_types == meal_type.lower()]
+    if candidates.size == 0:
+        return []
+
+    # Each macro is measured relative to the daily target, so grams and kcal weigh the same
+    scale = np.maximum(target, 1.0)
+    distances = np.linalg.norm((catalogue.macro_matrix[candidates] - remaining) / scale, axis=1)
+
+    if candidates.size > limit:
+        nearest = np.argpartition(distances, limit)[:limit]
+    else:
+        nearest = np.arange(candidates.size)
+    nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+
+    return [
+        {
+            **catalogue.items[index],
+            "isFavourite": catalogue.items[index]["uuid"] in favourites,
+            "distance": round(float(distance), 4),
+        }
+        for index, distance in zip(candidates[nearest].tolist(), distances[nearest].tolist())
+    ]
+
+
+def build_suggestions(catalogue: RecipeCatalogue, row, meal_type: str | None, limit: int, favourites: set[str]):
+    target, remaining = remaining_macros(row)
+    return {
+        "remaining": dict(zip(RECIPE_MACRO_FIELDS, remaining.astype(int).tolist())),
+        "recipes": rank_recipes(catalogue, target, remaining, meal_type, limit, favourites),
+    }
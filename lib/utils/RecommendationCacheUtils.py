@@ -0,0 +1,53 @@
+import hashlib
+import os
+
+from lib.utils.CacheUtils import TTLCache
+from lib.utils.UserMacrosUtils import encode_user_options, calculate_macros_batch, calculate_water_intake_batch
+
+RECOMMENDATION_CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "3600"))
+RECOMMENDATION_CACHE_MAX_SIZE = int(os.getenv("RECOMMENDATION_CACHE_MAX_SIZE", "10000"))
+
+OPTIONS_FIELDS = ("gender", "height", "weight", "weightGoal", "activityLevel", "age")
+
+# user uuid -> fingerprint of the options the recommendation was computed from
+user_fingerprints = TTLCache(max_size=RECOMMENDATION_CACHE_MAX_SIZE, ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS)
+# fingerprint -> recommendation, shared by every user with identical options
+recommendations = TTLCache(max_size=RECOMMENDATION_CACHE_MAX_SIZE, ttl_seconds=RECOMMENDATION_CACHE_TTL_SECONDS)
+
+
+def options_fingerprint(user_options):
+    raw = "|".join(str(getattr(user_options, field)) for field in OPTIONS_FIELDS)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_cached_recommendations(user_uuid: str):
+    fingerprint = user_fingerprints.get(user_uuid)
+    if fingerprint is None:
+        return None
+
+    return recommendations.get(fingerprint)
+
+
+def cache_recommendations(user_uuid: str, user_options):
+    fingerprint = options_fingerprint(user_options)
+    recommendation = recommendations.get(fingerprint)
+    if recommendation is None:
+        encoded = encode_user_options([user_options])
+        macros = calculate_macros_batch(encoded)
+        # Partial options still get a water recommendation, the macros stay None until they are complete
+        complete = bool(encoded["complete"][0])
+        recommendation = {field: int(values[0]) if complete else None for field, values in macros.items()}
+        recommendation["waterMl"] = int(calculate_water_intake_batch(encoded)[0])
+        recommendations.set(fingerprint, recommendation)
+
+    user_fingerprints.set(user_uuid, fingerprint)
+    return recommendation
+
+
+def invalidate_recommendations(user_uuid: str):
+    # Called by the options controllers whenever a user's options change
+    user_fingerprints.pop(user_uuid)
+
+
+def get_recommendation_cache_stats():
+    return {"users": user_fingerprints.stats(), "recommendations": recommendations.stats()}
@@ -0,0 +1,19 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+
+DataT = TypeVar("DataT")
+
+
+class RowModel(BaseModel):
+    # Validated straight from ORM objects or selected column rows, without going through dicts
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MessageResponse(BaseModel):
+    message: str
+
+
+class DataResponse(BaseModel, Generic[DataT]):
+    message: str
+    data: DataT
@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_IMPORT_LINE_BYTES = 64 * 1024
+MAX_REPORTED_IMPORT_ERRORS = 100
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+class ImportErrorEntry(BaseModel):
+    line: int
+    message: str
+
+
+class ImportResponse(BaseModel):
+    message: str
+    imported: int
+    failed: int
+    errors: list[ImportErrorEntry]
+
+
+def get_import_format(request: Request, import_format: Optional[str]):
+    if import_format is None:
+        content_type = request.headers.get("content-type", "")
+        import_format = "csv" if "csv" in content_type else "ndjson"
+
+    if import_format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported import format: {import_format}. Use 'ndjson' or 'csv'.")
+
+    return import_format
+
+
+async def iter_lines(request: Request):
+    # Only the current partial line is buffered, never the whole upload
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Lines are limited to {MAX_IMPORT_LINE_BYTES} bytes.")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+async def iter_records(request: Request, import_format: str):
+    header = None
+    line_number = 0
+    async for raw_line in iter_lines(request):
+        line_number += 1
+        # utf-8-sig drops the byte order mark spreadsheet exports put before the CSV header
+        line = raw_line.decode("utf-8-sig", errors="replace").strip()
+        if not line:
+            continue
+
+        if import_format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+                continue
+            yield line_number, record if isinstance(record, dict) else ValueError("Expected a JSON object")
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        yield line_number, dict(zip(header, values))
+
+
+def import_stopped(status_code: int, message: str, result: dict):
+    # Batches written before the failure stay committed, so the error says how far the import got
+    return HTTPException(status_code=status_code, detail={"message": message, **result})
+
+
+async def import_in_batches(request: Request, import_format: str, parse_record, write_batch):
+    # Each batch is committed on its own. If the upload or a write fails midway, the error detail
+    # carries the same counts as ImportResponse, with "imported" holding the rows already committed
+    result = {"imported": 0, "failed": 0, "errors": []}
+
+    def record_error(line_number, error):
+        result["failed"] += 1
+        if len(result["errors"]) < MAX_REPORTED_IMPORT_ERRORS:
+            result["errors"].append({"line": line_number, "message": str(error)})
+
+    batch = []
+    try:
+        async for line_number, record in iter_records(request, import_format):
+            if isinstance(record, Exception):
+                record_error(line_number, record)
+                continue
+
+            try:
+                batch.append(parse_record(record))
+            except (KeyError, TypeError, ValueError) as e:
+                record_error(line_number, e if not isinstance(e, KeyError) else f"Missing field {e}")
+                continue
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                # Database writes are blocking, keep them off the event loop
+                result["imported"] += await run_in_threadpool(write_batch, batch)
+                batch = []
+
+        if batch:
+            result["imported"] += await run_in_threadpool(write_batch, batch)
+            batch = []
+
+    except HTTPException as e:
+        result["failed"] += len(batch)
+        raise import_stopped(e.status_code, e.detail, result)
+    except Exception as e:
+        result["failed"] += len(batch)
+        raise import_stopped(500, f"An error occurred: {str(e)}", result)
+
+    return result
@@ -0,0 +1,85 @@
+import argparse
+import os
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from lib.database.models import UserOptions
+from lib.utils.UserMacrosUtils import (
+    encode_user_options, calculate_macros_batch, calculate_calories_batch, calculate_water_intake_batch,
+    upsert_user_macros_statement
+)
+
+MACROS_BATCH_SIZE = int(os.getenv("MACROS_BATCH_SIZE", "1000"))
+
+OPTIONS_COLUMNS = (
+    UserOptions.userUuid,
+    UserOptions.gender,
+    UserOptions.height,
+    UserOptions.weight,
+    UserOptions.weightGoal,
+    UserOptions.activityLevel,
+    UserOptions.age,
+)
+
+
+def recalculate_user_macros_chunk(db: Session, options_rows):
+    encoded = encode_user_options(options_rows)
+    macros = calculate_macros_batch(encoded)
+    intakes = calculate_calories_batch(encoded).astype(int).tolist()
+    user_uuids = [row.userUuid for row in options_rows]
+
+    macros_rows = [
+        {"userUuid": user_uuid, "calories": calories, "proteins": proteins, "fats": fats, "carbs": carbs}
+        for user_uuid, calories, proteins, fats, carbs in zip(
+            user_uuids,
+            macros["calories"].tolist(),
+            macros["proteins"].tolist(),
+            macros["fats"].tolist(),
+            macros["carbs"].tolist(),
+        )
+    ]
+    db.execute(upsert_user_macros_statement(macros_rows))
+
+    # ORM bulk UPDATE by primary key, sent as a single executemany
+    db.execute(update(UserOptions), [
+        {"userUuid": user_uuid, "caloriesIntake": intake} for user_uuid, intake in zip(user_uuids, intakes)
+    ])
+
+    return calculate_water_intake_batch(encoded)
+
+
+def recalculate_all_user_macros(db: Session, batch_size: int = MACROS_BATCH_SIZE):
+    last_user_uuid = None
+    total = 0
+    while True:
+        query = db.query(*OPTIONS_COLUMNS).filter(
+            UserOptions.gender.is_not(None),
+            UserOptions.height.is_not(None),
+            UserOptions.weight.is_not(None),
+            UserOptions.age.is_not(None),
+        )
+        if last_user_uuid is not None:
+            query = query.filter(UserOptions.userUuid > last_user_uuid)
+        options_rows = query.order_by(UserOptions.userUuid).limit(batch_size).all()
+        if not options_rows:
+            break
+
+        recalculate_user_macros_chunk(db, options_rows)
+        db.commit()
+
+        last_user_uuid = options_rows[-1].userUuid
+        total += len(options_rows)
+
+    return total
+
+
+if __name__ == "__main__":
+    from lib.database.config import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Recalculate UserMacros and caloriesIntake for every user.")
+    parser.add_argument("--batch-size", type=int, default=MACROS_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        print(f"Recalculated macros for {recalculate_all_user_macros(db, args.batch_size)} users")
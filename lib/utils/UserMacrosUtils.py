@@ -1,86 +1,131 @@
-from lib.database.models import UserMacros, ActivityLevel, WeightGoal
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
 
+from lib.database.models import UserMacros, ActivityLevel, WeightGoal
 
-def calculate_user_macros(user, user_options):
-    # Calculate base calories
-    gender_factor = 5 if user_options.gender.lower() == "Чоловік" else -161
-    base_calories = int(10 * float(user_options.weight) +
-                        6.25 * float(user_options.height) -
-                        5 * int(user_options.age) +
-                        gender_factor)
-
-    # Adjust for activity level
-    activity_multiplier = {
-        ActivityLevel.SEDENTARY: 1.2,
-        ActivityLevel.LOW_ACTIVE: 1.375,
-        ActivityLevel.ACTIVE: 1.55,
-        ActivityLevel.VERY_ACTIVE: 1.725
+ACTIVITY_MULTIPLIERS = {
+    ActivityLevel.SEDENTARY: 1.2,
+    ActivityLevel.LOW_ACTIVE: 1.375,
+    ActivityLevel.ACTIVE: 1.55,
+    ActivityLevel.VERY_ACTIVE: 1.725
+}
+
+WEIGHT_GOAL_FACTORS = {
+    WeightGoal.LOSE: 0.9,  # Reduce by 10% for weight loss
+    WeightGoal.GAIN: 1.1,  # Increase by 10% for weight gain
+}
+
+WATER_ACTIVITY_ADJUSTMENTS = {
+    ActivityLevel.SEDENTARY: 0,
+    ActivityLevel.LOW_ACTIVE: 250,  # Add 250 mL for low activity
+    ActivityLevel.ACTIVE: 500,  # Add 500 mL for active
+    ActivityLevel.VERY_ACTIVE: 1000,  # Add 1L for very active
+}
+
+
+def float_or_nan(value):
+    return float(value) if value is not None else np.nan
+
+
+def encode_user_options(options_list):
+    # Turn a chunk of UserOptions (or rows with the same attributes) into numeric arrays.
+    # Missing calorie inputs become NaN and the row is flagged incomplete; water only needs the weight
+    encoded = {
+        "weight": np.array([float_or_nan(options.weight) for options in options_list], dtype=float),
+        "height": np.array([float_or_nan(options.height) for options in options_list], dtype=float),
+        "age": np.array([float_or_nan(options.age) for options in options_list], dtype=float),
+        "gender_factor": np.array(
+            [np.nan if options.gender is None else 5 if options.gender.lower() == "Чоловік" else -161
+             for options in options_list], dtype=float
+        ),
+        "activity_multiplier": np.array(
+            [ACTIVITY_MULTIPLIERS.get(options.activityLevel, 1.2) for options in options_list], dtype=float
+        ),
+        "goal_factor": np.array(
+            [WEIGHT_GOAL_FACTORS.get(options.weightGoal, 1.0) for options in options_list], dtype=float
+        ),
+        "water_weight": np.array(
+            [float(options.weight) if options.weight else 0.0 for options in options_list], dtype=float
+        ),
+        "water_adjustment": np.array(
+            [WATER_ACTIVITY_ADJUSTMENTS.get(options.activityLevel, 0) for options in options_list], dtype=float
+        ),
     }
+    encoded["complete"] = ~np.isnan(
+        encoded["weight"] + encoded["height"] + encoded["age"] + encoded["gender_factor"]
+    )
+    return encoded
 
-    activity_calories = base_calories * activity_multiplier.get(user_options.activityLevel, 1.2)
 
-    # Adjust for weight goal
-    if user_options.weightGoal == WeightGoal.LOSE:
-        calories = int(activity_calories * 0.9)  # Reduce by 10% for weight loss
-    elif user_options.weightGoal == WeightGoal.GAIN:
-        calories = int(activity_calories * 1.1)  # Increase by 10% for weight gain
-    else:
-        calories = int(activity_calories)  # No change for weight maintenance
+def calculate_calories_batch(encoded):
+    # Mifflin-St Jeor BMR, truncated like the original int() arithmetic
+    base_calories = np.trunc(10 * encoded["weight"] +
+                             6.25 * encoded["height"] -
+                             5 * encoded["age"] +
+                             encoded["gender_factor"])
 
-    # Calculate macros
-    proteins = int(calories * 0.25 / 4)
-    fats = int(calories * 0.30 / 9)
-    carbs = int(calories * 0.45 / 4)
+    # Adjust for activity level (TDEE), then for the weight goal
+    activity_calories = base_calories * encoded["activity_multiplier"]
+    return np.trunc(activity_calories * encoded["goal_factor"])
 
-    return UserMacros(userUuid=user.uuid, calories=calories, proteins=proteins, fats=fats, carbs=carbs)
 
-def calculate_user_intake(user_options):
-    # Calculate base calories
-    gender_factor = 5 if user_options.gender.lower() == "Чоловік" else -161
-    base_calories = int(10 * float(user_options.weight) +
-                        6.25 * float(user_options.height) -
-                        5 * int(user_options.age) +
-                        gender_factor)
-
-    # Adjust for activity level
-    activity_multiplier = {
-        ActivityLevel.SEDENTARY: 1.2,
-        ActivityLevel.LOW_ACTIVE: 1.375,
-        ActivityLevel.ACTIVE: 1.55,
-        ActivityLevel.VERY_ACTIVE: 1.725
+def calculate_macros_batch(encoded):
+    # Incomplete rows come out as 0, callers check encoded["complete"]
+    calories = np.nan_to_num(calculate_calories_batch(encoded))
+
+    return {
+        "calories": calories.astype(np.int64),
+        "proteins": np.trunc(calories * 0.25 / 4).astype(np.int64),
+        "fats": np.trunc(calories * 0.30 / 9).astype(np.int64),
+        "carbs": np.trunc(calories * 0.45 / 4).astype(np.int64),
     }
 
-    activity_calories = base_calories * activity_multiplier.get(user_options.activityLevel, 1.2)
 
-    # Adjust for weight goal
-    if user_options.weightGoal == WeightGoal.LOSE:
-        calories = int(activity_calories * 0.9)  # Reduce by 10% for weight loss
-    elif user_options.weightGoal == WeightGoal.GAIN:
-        calories = int(activity_calories * 1.1)  # Increase by 10% for weight gain
-    else:
-        calories = int(activity_calories)  # No change for weight maintenance
+def calculate_water_intake_batch(encoded):
+    # 30 mL per kg of body weight (converted from pounds) plus an activity adjustment
+    weight_in_kg = encoded["water_weight"] / 2.2
+    return np.trunc(weight_in_kg * 30 + encoded["water_adjustment"]).astype(np.int64)
 
-    return calories
 
+def encode_complete_user_options(user_options):
+    encoded = encode_user_options([user_options])
+    if not encoded["complete"][0]:
+        raise ValueError("Gender, height, weight and age are required to calculate calories.")
+    return encoded
 
 
-def calculate_water_intake(user_options):
-    # Convert weight to kilograms (if it's in pounds)
-    weight_in_kg = float(user_options.weight) / 2.2 if user_options.weight else 0
-
-    # Calculate base water intake (30-35 mL per kg of body weight)
-    base_water_intake = weight_in_kg * 30  # 30 mL per kg
-
-    # Adjust for activity level
-    activity_adjustments = {
-        ActivityLevel.SEDENTARY: 0,
-        ActivityLevel.LOW_ACTIVE: 250,  # Add 250 mL for low activity
-        ActivityLevel.ACTIVE: 500,  # Add 500 mL for active
-        ActivityLevel.VERY_ACTIVE: 1000,  # Add 1L for very active
+def calculate_user_macros(user, user_options):
+    macros = calculate_macros_batch(encode_complete_user_options(user_options))
+
+    return UserMacros(userUuid=user.uuid,
+                      calories=int(macros["calories"][0]),
+                      proteins=int(macros["proteins"][0]),
+                      fats=int(macros["fats"][0]),
+                      carbs=int(macros["carbs"][0]))
+
+def upsert_user_macros_statement(macros_rows: list[dict]):
+    # One INSERT ... ON CONFLICT for new and existing users alike, no read first
+    statement = insert(UserMacros).values(macros_rows)
+    return statement.on_conflict_do_update(
+        index_elements=[UserMacros.userUuid],
+        set_={field: statement.excluded[field] for field in ("calories", "proteins", "fats", "carbs")},
+    )
+
+
+def user_macros_row(user_macros: UserMacros):
+    return {
+        "userUuid": user_macros.userUuid,
+        "calories": user_macros.calories,
+        "proteins": user_macros.proteins,
+        "fats": user_macros.fats,
+        "carbs": user_macros.carbs,
     }
 
-    # Adjust the water intake based on activity level
-    water_intake = base_water_intake + activity_adjustments.get(user_options.activityLevel, 0)
 
-    return int(water_intake)  # Return the final water intake in mL
+def calculate_user_intake(user_options):
+    return int(calculate_calories_batch(encode_complete_user_options(user_options))[0])
 
+
+def calculate_water_intake(user_options):
+    # Return the final water intake in mL
+    return int(calculate_water_intake_batch(encode_user_options([user_options]))[0])
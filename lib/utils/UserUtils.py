@@ -1,22 +1,121 @@
+import logging
+import os
+import time
+
 from fastapi import HTTPException
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from lib.database.models import User
+from lib.utils.CacheUtils import TTLCache
+from lib.utils.MetricsUtils import time_phase
 
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
 
-def get_user_from_token(token: str, db: Session):
-    try:
-        payload = jwt.decode(token, "super-secret-access-token-key", algorithms=["HS256"])
-        print(payload)
-        email = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=403, detail="Could not validate credentials")
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+logger = logging.getLogger(__name__)
+
+# Bearer token -> already verified claims, so repeat requests skip signature verification
+token_claims_cache = TTLCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl_seconds=TOKEN_CACHE_TTL_SECONDS)
+
+# Authenticated user identities, keyed by ("sub", email) and ("uuid", uuid)
+user_cache = TTLCache(max_size=USER_CACHE_MAX_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+
+def cache_user(user: User):
+    identity = (user.uuid, user.email, user.registeredAt, user.tokenVersion or 0)
+    user_cache.set(("sub", user.email), identity)
+    user_cache.set(("uuid", user.uuid), identity)
 
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
-            raise HTTPException(status_code=404, detail="User not found")
 
-        return user
+def invalidate_cached_user(uuid: str | None = None, email: str | None = None):
+    # Called on register, on token revocation and whenever credentials change (e.g. password change)
+    for key in (("uuid", uuid), ("sub", email)):
+        if key[1] is None:
+            continue
+        identity = user_cache.pop(key)
+        if identity is not None:
+            user_cache.pop(("uuid", identity[0]))
+            user_cache.pop(("sub", identity[1]))
+
+
+def get_user_cache_stats():
+    return {"users": user_cache.stats(), "tokens": token_claims_cache.stats()}
+
+
+def decode_token_claims(token: str):
+    claims = token_claims_cache.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        with time_phase("jwt_decode"):
+            payload = jwt.decode(token, "super-secret-access-token-key", algorithms=["HS256"])
     except JWTError:
-        raise HTTPException(status_code=403, detail="Could not validate credentials")
\ No newline at end of file
+        raise HTTPException(status_code=403, detail="Could not validate credentials")
+
+    email = payload.get("sub")
+    if email is None:
+        raise HTTPException(status_code=403, detail="Could not validate credentials")
+
+    logger.debug("Decoded token for %s", email)
+    # Tokens issued before versioning carry no "ver" and count as version 0
+    claims = (email, payload.get("uuid"), payload.get("ver", 0))
+    expires_in = payload["exp"] - time.time() if "exp" in payload else TOKEN_CACHE_TTL_SECONDS
+    token_claims_cache.set(token, claims, min(expires_in, TOKEN_CACHE_TTL_SECONDS))
+    return claims
+
+
+def get_cached_user(email: str, user_uuid: str | None):
+    identity = user_cache.get(("uuid", user_uuid) if user_uuid else ("sub", email))
+    if identity is None or identity[1] != email:
+        return None
+
+    return User(uuid=identity[0], email=identity[1], registeredAt=identity[2], tokenVersion=identity[3])
+
+
+def check_token_version(user: User, token_version: int):
+    if (user.tokenVersion or 0) != token_version:
+        raise HTTPException(status_code=403, detail="Token has been revoked")
+    return user
+
+
+def user_lookup_query(email: str, user_uuid: str | None):
+    # Prefer the primary key when the token carries the user id
+    if user_uuid:
+        return select(User).where(User.uuid == user_uuid, User.email == email)
+    return select(User).where(User.email == email).limit(1)
+
+
+def get_user_from_token(token: str, db: Session):
+    email, user_uuid, token_version = decode_token_claims(token)
+    cached_user = get_cached_user(email, user_uuid)
+    if cached_user is not None:
+        return check_token_version(cached_user, token_version)
+
+    user = db.execute(user_lookup_query(email, user_uuid)).scalars().first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    cache_user(user)
+    return check_token_version(user, token_version)
+
+
+async def get_user_from_token_async(token: str, db: AsyncSession):
+    email, user_uuid, token_version = decode_token_claims(token)
+    cached_user = get_cached_user(email, user_uuid)
+    if cached_user is not None:
+        return check_token_version(cached_user, token_version)
+
+    result = await db.execute(user_lookup_query(email, user_uuid))
+    user = result.scalars().first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    cache_user(user)
+    return check_token_version(user, token_version)
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+# Largest exponent a chunk of the EWMA is allowed to scale by before it is rebased
+EWMA_MAX_EXPONENT = 30.0
+# Goals further out than this at the current rate aren't projected; a near-flat trend would overflow the date
+GOAL_PROJECTION_MAX_DAYS = 5 * 365
+
+
+def moving_average(values: np.ndarray, window: int):
+    # Trailing mean over the last `window` observations, shorter at the start of the series
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (cumulative[ends] - cumulative[starts]) / (ends - starts)
+
+
+def ewma(values: np.ndarray, alpha: float):
+    # y[i] = alpha * x[i] + (1 - alpha) * y[i - 1], unrolled into cumulative sums chunk by chunk
+    # so that (1 - alpha) ** -i never overflows
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return values.astype(float)
+
+    chunk_size = max(1, int(EWMA_MAX_EXPONENT / -np.log(decay)))
+    smoothed = np.empty(len(values), dtype=float)
+    previous = float(values[0]) if len(values) else 0.0
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        powers = decay ** np.arange(len(chunk))
+        smoothed[start:start + len(chunk)] = (
+            decay * powers * previous + alpha * powers * np.cumsum(chunk / powers)
+        )
+        previous = smoothed[start + len(chunk) - 1]
+
+    return smoothed
+
+
+def weekly_rate(days: np.ndarray, trend: np.ndarray, rate_window_days: int):
+    # Least-squares slope of the smoothed series over the most recent window, in kg per week
+    recent = days >= days[-1] - rate_window_days
+    if np.count_nonzero(recent) < 2 or np.ptp(days[recent]) == 0:
+        return None
+
+    slope, _ = np.polyfit(days[recent], trend[recent], 1)
+    return float(slope * 7)
+
+
+def project_goal_date(last_date: date, current_weight: float, goal_weight: float, rate_per_week: float | None):
+    if rate_per_week is None or rate_per_week == 0:
+        return None
+
+    remaining = goal_weight - current_weight
+    if remaining * rate_per_week < 0:
+        # Trending away from the goal
+        return None
+
+    days = np.ceil(remaining / rate_per_week * 7)
+    if days > min(GOAL_PROJECTION_MAX_DAYS, (date.max - last_date).days):
+        return None
+
+    return last_date + timedelta(days=int(days))
+
+
+def calculate_weight_trend(dates: list[date], weights: list[float], window: int, alpha: float,
+                           rate_window_days: int, goal_weight: float | None = None):
+    if not dates:
+        return {"points": [], "weeklyRate": None, "trendWeight": None, "projectedGoalDate": None}
+
+    values = np.asarray(weights, dtype=float)
+    days = np.asarray([d.toordinal() for d in dates], dtype=float)
+
+    averages = moving_average(values, window)
+    smoothed = ewma(values, alpha)
+    rate = weekly_rate(days, smoothed, rate_window_days)
+    trend_weight = float(smoothed[-1])
+
+    projected = None
+    if goal_weight is not None:
+        projected = project_goal_date(dates[-1], trend_weight, goal_weight, rate)
+
+    points = [
+        {"date": d.isoformat(), "weight": weight, "movingAverage": average, "ewma": smooth}
+        for d, weight, average, smooth in zip(
+            dates, values.tolist(), np.round(averages, 2).tolist(), np.round(smoothed, 2).tolist()
+        )
+    ]
+
+    return {
+        "points": points,
+        "weeklyRate": round(rate, 3) if rate is not None else None,
+        "trendWeight": round(trend_weight, 2),
+        "projectedGoalDate": projected.isoformat() if projected else None,
+    }
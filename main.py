@@ -1,4 +1,9 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from lib.controllers.UserMacrosController import userMacrosRouter
 from lib.controllers.UserMealsController import userMealsRouter
@@ -7,8 +12,74 @@ from lib.controllers.UserWaterIntakeController import userWaterIntakesRouter
 from lib.controllers.UserWeightController import userWeightRouter
 from lib.controllers.AuthController import authRouter
 from lib.controllers.RecipesController import recipesRouter
+from lib.controllers.NutritionSummaryController import nutritionSummaryRouter
+from lib.controllers.DashboardController import dashboardRouter
+from lib.controllers.ExportController import exportRouter
+from lib.controllers.FavouriteRecipesController import favouriteRecipesRouter
+from lib.database.config import DB_ASYNC_MODE, warm_up_pool, warm_up_async_pool, get_pool_stats
+from lib.utils.LoggingUtils import configure_logging
+from lib.utils.ReadRoutingUtils import ReadAfterWriteMiddleware
+from lib.utils.ResponseUtils import MessageResponse
+from lib.utils.MetricsUtils import MetricsMiddleware, render_metrics, PROMETHEUS_CONTENT_TYPE
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        warm_up_pool()
+        if DB_ASYNC_MODE:
+            await warm_up_async_pool()
+    except SQLAlchemyError as e:
+        logger.warning("Database pool warm-up failed: %s", e)
+    yield
+
+
+def route_keys(route):
+    return {(route.path, method) for method in getattr(route, "methods", None) or ()}
+
+
+def without_routes(router: APIRouter, replaced: set):
+    # A copy of the router holding only the routes that have no replacement, so no path is registered twice
+    remaining = APIRouter()
+    remaining.routes.extend(route for route in router.routes if not route_keys(route) <= replaced)
+    return remaining
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(ReadAfterWriteMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+if DB_ASYNC_MODE:
+    from lib.controllers.AsyncUserMacrosController import asyncUserMacrosRouter
+    from lib.controllers.AsyncUserMealsController import asyncUserMealsRouter
+    from lib.controllers.AsyncUserOptionsController import asyncUserOptionsRouter
+    from lib.controllers.AsyncUserWaterIntakeController import asyncUserWaterIntakesRouter
+    from lib.controllers.AsyncUserWeightController import asyncUserWeightRouter
+    from lib.controllers.AsyncRecipesController import asyncRecipesRouter
+
+    # The sync routers below keep only the routes that have no async version
+    app.include_router(asyncUserOptionsRouter, prefix="/api", tags=["UserOptions"])
+    app.include_router(asyncUserMacrosRouter, prefix="/api", tags=["UserMacros"])
+    app.include_router(asyncUserMealsRouter, prefix="/api", tags=["UserMeals"])
+    app.include_router(asyncUserWaterIntakesRouter, prefix="/api", tags=["UserWaterIntakes"])
+    app.include_router(asyncUserWeightRouter, prefix="/api", tags=["UserWeights"])
+    app.include_router(asyncRecipesRouter, prefix="/api", tags=["Recipes"])
+
+    async_routes = set().union(*(
+        route_keys(route)
+        for router in (asyncUserOptionsRouter, asyncUserMacrosRouter, asyncUserMealsRouter,
+                       asyncUserWaterIntakesRouter, asyncUserWeightRouter, asyncRecipesRouter)
+        for route in router.routes
+    ))
+    userOptionsRouter = without_routes(userOptionsRouter, async_routes)
+    userMacrosRouter = without_routes(userMacrosRouter, async_routes)
+    userMealsRouter = without_routes(userMealsRouter, async_routes)
+    userWaterIntakesRouter = without_routes(userWaterIntakesRouter, async_routes)
+    userWeightRouter = without_routes(userWeightRouter, async_routes)
+    recipesRouter = without_routes(recipesRouter, async_routes)
 
 app.include_router(authRouter, prefix="/api", tags=["Auth"])
 app.include_router(userOptionsRouter, prefix="/api", tags=["UserOptions"])
@@ -17,7 +88,21 @@ app.include_router(userMealsRouter, prefix="/api", tags=["UserMeals"])
 app.include_router(userWaterIntakesRouter, prefix="/api", tags=["UserWaterIntakes"])
 app.include_router(userWeightRouter, prefix="/api", tags=["UserWeights"])
 app.include_router(recipesRouter, prefix="/api", tags=["Recipes"])
+app.include_router(favouriteRecipesRouter, prefix="/api", tags=["FavouriteRecipes"])
+app.include_router(nutritionSummaryRouter, prefix="/api", tags=["NutritionSummary"])
+app.include_router(dashboardRouter, prefix="/api", tags=["Dashboard"])
+app.include_router(exportRouter, prefix="/api", tags=["Export"])
 
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
 def read_root():
     return {"message": "Welcome to the API!"}
+
+
+@app.get("/health/db-pool")
+def db_pool_health():
+    return get_pool_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
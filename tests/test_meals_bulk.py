@@ -0,0 +1,37 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from lib.database.config import Base, engine, SessionLocal
+from lib.database.models import Meal
+
+try:
+    Base.metadata.create_all(engine)
+except OperationalError:
+    pytest.skip("database is not reachable", allow_module_level=True)
+
+import main
+
+
+def make_meal(meal_type: str):
+    return {"uuid": str(uuid.uuid4()), "title": "Oats", "weight": 200, "mealType": meal_type, "calories": 300,
+            "proteins": 10, "fats": 5, "carbs": 50}
+
+
+def test_mixed_batch_with_lowercase_meal_type():
+    with TestClient(main.app) as client:
+        credentials = {"email": f"{uuid.uuid4()}@bulk.test", "password": "secret"}
+        token = client.post("/api/register", json=credentials).json()["accessToken"]
+
+        meals = [make_meal("Breakfast"), make_meal("lunch"), make_meal("brunch")]
+        response = client.post("/api/create_meals_bulk", json=meals, headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    assert [result["status"] for result in response.json()["results"]] == ["created", "created", "invalid"]
+
+    with SessionLocal() as db:
+        assert db.execute(select(Meal.mealType).where(Meal.uuid == meals[1]["uuid"])).scalar_one().name == "Lunch"
@@ -0,0 +1,23 @@
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from lib.utils.PaginationUtils import encode_cursor, decode_cursor, decode_cursor_values
+
+
+def test_meal_cursor_round_trips():
+    assert decode_cursor(encode_cursor(date(2024, 1, 5), "abc")) == (date(2024, 1, 5), "abc")
+
+
+def test_single_key_cursor_round_trips():
+    assert decode_cursor_values(encode_cursor("recipe-uuid"), 1) == ["recipe-uuid"]
+
+
+def test_cursor_of_another_shape_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor("recipe-uuid"))
+    assert error.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        decode_cursor_values("!!not-base64", 1)
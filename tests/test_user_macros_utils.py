@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from lib.database.models import ActivityLevel
+from lib.utils.RecommendationCacheUtils import cache_recommendations, recommendations, user_fingerprints
+from lib.utils.UserMacrosUtils import (
+    encode_user_options, calculate_macros_batch, calculate_water_intake, calculate_user_intake
+)
+
+
+def make_options(**overrides):
+    options = {
+        "gender": "Чоловік",
+        "height": 180.0,
+        "weight": 80.0,
+        "weightGoal": None,
+        "activityLevel": ActivityLevel.ACTIVE,
+        "age": 30,
+    }
+    options.update(overrides)
+    return SimpleNamespace(**options)
+
+
+@pytest.fixture(autouse=True)
+def clear_recommendation_cache():
+    recommendations.clear()
+    user_fingerprints.clear()
+
+
+@pytest.mark.parametrize("field", ["gender", "height", "weight", "age"])
+def test_missing_calorie_inputs_mark_row_incomplete(field):
+    encoded = encode_user_options([make_options(), make_options(**{field: None})])
+
+    assert encoded["complete"].tolist() == [True, False]
+    macros = calculate_macros_batch(encoded)
+    assert macros["calories"][0] > 0
+    assert macros["calories"][1] == 0
+
+
+def test_water_intake_treats_missing_weight_as_zero():
+    assert calculate_water_intake(make_options(weight=None, height=None, age=None, gender=None)) == 500
+    assert calculate_water_intake(make_options(weight=None, activityLevel=None)) == 0
+
+
+def test_calorie_intake_requires_complete_options():
+    with pytest.raises(ValueError):
+        calculate_user_intake(make_options(age=None))
+
+
+def test_partial_options_recommend_water_only():
+    recommendation = cache_recommendations("user", make_options(height=None))
+
+    assert recommendation["waterMl"] == int(np.trunc(80.0 / 2.2 * 30 + 500))
+    assert recommendation["calories"] is None
+    assert recommendation["proteins"] is None
@@ -0,0 +1,15 @@
+from datetime import date
+
+import pytest
+
+from lib.controllers.UserWeightController import parse_weight_record
+
+
+def test_parses_weight_record():
+    assert parse_weight_record({"date": " 2024-01-01 ", "weight": "80.5"}) == {"date": date(2024, 1, 1), "weight": 80.5}
+
+
+@pytest.mark.parametrize("weight", ["nan", "inf", "-Infinity", float("nan")])
+def test_non_finite_weight_is_rejected(weight):
+    with pytest.raises(ValueError):
+        parse_weight_record({"date": "2024-01-01", "weight": weight})
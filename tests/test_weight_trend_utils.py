@@ -0,0 +1,19 @@
+from datetime import date, timedelta
+
+from lib.utils.WeightTrendUtils import GOAL_PROJECTION_MAX_DAYS, project_goal_date
+
+
+def test_projects_goal_date_at_current_rate():
+    assert project_goal_date(date(2024, 1, 1), 80, 78, -1) == date(2024, 1, 15)
+
+
+def test_goal_beyond_horizon_is_not_projected():
+    today = date(2024, 1, 1)
+    assert project_goal_date(today, 80, 60, -1e-9) is None
+    assert project_goal_date(date.max - timedelta(days=3), 80, 79, -1) is None
+    rate = -20 * 7 / (GOAL_PROJECTION_MAX_DAYS + 1)
+    assert project_goal_date(today, 80, 60, rate) is None
+
+
+def test_trending_away_from_goal_is_not_projected():
+    assert project_goal_date(date(2024, 1, 1), 80, 70, 0.5) is None